@@ -29,6 +29,11 @@ def q(s: Optional[str]) -> str:
            .replace("\t", "\\t"))
     return f'"{s}"'
 
+def _sym_text(sym: clingo.Symbol) -> str:
+    """Claim/CQ id carried by a shown atom argument: the raw string payload
+    (ids are emitted via q()), so no str() round-trip and quote stripping."""
+    return sym.string if sym.type == clingo.SymbolType.String else str(sym)
+
 _ALLOWED_TYPES = {"premise", "intermediate", "conclusion"}
 def clamp_claim_type(t: Optional[str]) -> str:
     """Ensure claim type is one of the allowed atoms; default to 'premise' if unknown."""
@@ -264,8 +269,8 @@ class ASPDebugger:
                 
                 for atom in model.symbols(shown=True):
                     if atom.name == "missing_link":
-                        from_claims = str(atom.arguments[0]).strip('"')
-                        to_claim = str(atom.arguments[1]).strip('"')
+                        from_claims = _sym_text(atom.arguments[0])
+                        to_claim = _sym_text(atom.arguments[1])
                         issues.append(Issue(
                             type="missing_link",
                             description=f"No clear logical connection to reach {to_claim}",
@@ -273,7 +278,7 @@ class ASPDebugger:
                         ))
                     
                     elif atom.name == "unsupported_premise":
-                        claim_id = str(atom.arguments[0]).strip('"')
+                        claim_id = _sym_text(atom.arguments[0])
                         issues.append(Issue(
                             type="unsupported_premise",
                             description=f"Premise {claim_id} needs supporting evidence",
@@ -281,7 +286,7 @@ class ASPDebugger:
                         ))
                     
                     elif atom.name == "circular_reasoning":
-                        claim_id = str(atom.arguments[0]).strip('"')
+                        claim_id = _sym_text(atom.arguments[0])
                         if not any(i.type == "circular" for i in issues):
                             issues.append(Issue(
                                 type="circular",
@@ -290,7 +295,7 @@ class ASPDebugger:
                             ))
                     
                     elif atom.name == "false_dichotomy":
-                        claim_id = str(atom.arguments[0]).strip('"')
+                        claim_id = _sym_text(atom.arguments[0])
                         issues.append(Issue(
                             type="false_dichotomy",
                             description=f"False dichotomy in {claim_id}: presents only two options when more may exist",
@@ -298,7 +303,7 @@ class ASPDebugger:
                         ))
                     
                     elif atom.name == "slippery_slope":
-                        claim_id = str(atom.arguments[0]).strip('"')
+                        claim_id = _sym_text(atom.arguments[0])
                         issues.append(Issue(
                             type="slippery_slope",
                             description=f"Slippery slope in {claim_id}: argues that one action leads to extreme consequences without justification",
@@ -306,8 +311,8 @@ class ASPDebugger:
                         ))
                     
                     elif atom.name == "contradiction":
-                        claim1 = str(atom.arguments[0]).strip('"')
-                        claim2 = str(atom.arguments[1]).strip('"')
+                        claim1 = _sym_text(atom.arguments[0])
+                        claim2 = _sym_text(atom.arguments[1])
                         # Only add once (avoid duplicates from both directions)
                         if claim1 < claim2:
                             issues.append(Issue(
@@ -317,8 +322,8 @@ class ASPDebugger:
                             ))
 
                     elif atom.name == "missing_cq":
-                        to_claim = str(atom.arguments[0]).strip('"')
-                        cq_id = str(atom.arguments[1]).strip('"')
+                        to_claim = _sym_text(atom.arguments[0])
+                        cq_id = _sym_text(atom.arguments[1])
                         text = format_cq_extended(cq_id) if self.cq_extended else format_cq_one_liner(cq_id)
                         issues.append(Issue(
                             type="missing_cq",
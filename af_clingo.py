@@ -2,25 +2,39 @@
 # af_clingo.py — clingo-backed semantics for Dung AFs (with CLI)
 from __future__ import annotations
 import argparse
+import atexit
 import json
+import multiprocessing
+import os
 import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Iterable, List, Set, Tuple, FrozenSet
 import clingo
 
 # ---------- APX reading (arg/att facts) ----------
-_APX_ARG = re.compile(r"\barg\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)\s*\.", re.I)
-_APX_ATT = re.compile(r"\batt\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*,\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)\s*\.", re.I)
-_APX_COMM = re.compile(r"%.*?$", re.M)
+# arg/1 or att/2 in one alternation, so a single scan yields both
+_APX_FACT = re.compile(r"\b(?:arg\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)|att\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*,\s*([A-Za-z_][A-Za-z0-9_]*)\s*\))\s*\.", re.I)
+_APX_COMM = re.compile(r"%[^\n]*")   # to end of line, no lazy per-char $ probe
 
 def read_apx(path: str) -> Tuple[List[str], Set[Tuple[str,str]]]:
     """Read APX file and return (arguments, attacks)."""
     text = open(path, "r", encoding="utf-8").read()
-    text_nc = re.sub(_APX_COMM, "", text)
-    args = list(dict.fromkeys(_APX_ARG.findall(text_nc)))   # preserve order
-    atts = set(_APX_ATT.findall(text_nc))
+    text_nc = _APX_COMM.sub("", text)
+    arg_seen = {}   # dicts preserve order
+    att_seen = {}
+    for a, u, v in _APX_FACT.findall(text_nc):
+        if a:
+            arg_seen[a] = None
+        else:
+            att_seen[(u, v)] = None
+    args = list(arg_seen)
+    atts = set(att_seen)
     # Ensure atoms in attacks appear as arguments
     aset = set(args)
-    for u, v in atts:
+    for u, v in att_seen:
         if u not in aset:
             args.append(u); aset.add(u)
         if v not in aset:
@@ -137,10 +151,149 @@ def semi_stable(arguments, attacks) -> List[FrozenSet[str]]:
 def admissible(arguments, attacks) -> List[FrozenSet[str]]:
     return _solve_models(facts_from_af(arguments, attacks), ENCODING["admissible"])
 
+def _ordered(fam: List[FrozenSet[str]]) -> List[FrozenSet[str]]:
+    """Extensions by (size, sorted members): independent of clingo's model order."""
+    return sorted(fam, key=lambda S: (len(S), sorted(S)))
+
+def _maximal(adm: List[FrozenSet[str]]) -> List[FrozenSet[str]]:
+    return [S for S in adm if not any(S < T for T in adm)]
+
 def preferred(arguments, attacks) -> List[FrozenSet[str]]:
     # enumerate admissible with clingo, pick ⊆-maximal in Python
-    adm = admissible(arguments, attacks)
-    return [S for S in adm if not any(S < T for T in adm)]
+    return _maximal(admissible(arguments, attacks))
+
+# Solves behind all_semantics; grounded, preferred and stable are read off the
+# complete extensions, so only these encodings are ground (one worker each
+# with parallel=True).
+_ALL_ENCODINGS = ("complete", "stage", "semi-stable")
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    # Workers are not forked: the pool is created lazily, typically inside a
+    # server that already runs threads, and forking those can deadlock.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            # shared by concurrent callers: one solve per worker, at least
+            # enough workers for one AF's solves
+            workers = max(len(_ALL_ENCODINGS), os.cpu_count() or 1)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        return _pool
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a (broken) pool so the next parallel call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+@atexit.register
+def _shutdown_pool() -> None:
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+def _acyclic_extension(args: List[str], atts: List[Tuple[str,str]]):
+    """The unique complete extension when the attack graph over `args` is
+    acyclic (attack-free included): walk a topological order, taking an
+    argument iff none of its attackers was taken. None if there is a cycle
+    (or an attack mentions a non-argument) and clingo is needed."""
+    attackers: dict = {a: [] for a in args}
+    out: dict = {a: [] for a in args}
+    for u, v in atts:
+        if u not in attackers or v not in attackers:
+            return None
+        attackers[v].append(u)
+        out[u].append(v)
+    indeg = {a: len(bs) for a, bs in attackers.items()}
+    ready = [a for a, d in indeg.items() if d == 0]
+    ext = set()
+    seen = 0
+    while ready:
+        a = ready.pop()
+        seen += 1
+        if not any(b in ext for b in attackers[a]):
+            ext.add(a)
+        for v in out[a]:
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                ready.append(v)
+    return frozenset(ext) if seen == len(indeg) else None
+
+def all_semantics(arguments: Iterable[str], attacks: Iterable[Tuple[str,str]],
+                  parallel: bool = False) -> dict:
+    """Every semantics in SEMANTICS (without the "semistable" alias) for one AF.
+    The facts are rendered once and shared by the per-semantics solves; with
+    parallel=True the independent solves run in a persistent process pool
+    (forkserver/spawn workers, which re-import the caller's __main__: scripts
+    must keep their top-level work under `if __name__ == "__main__":`). If the
+    pool cannot start or breaks, the solves run in-process with a warning.
+
+    From the complete extensions: grounded is the least one (it is contained
+    in all of them, so the smallest is it), preferred the ⊆-maximal ones,
+    stable those whose range covers every argument. Stage and semi-stable keep their own encodings.
+    Every family is listed by (size, sorted members)."""
+    args = list(arguments)
+    atts = list(attacks)
+    if not args:
+        # nothing to ground: every family is just the empty extension
+        return {"grounded": frozenset(), "preferred": [frozenset()], "stable": [frozenset()],
+                "complete": [frozenset()], "stage": [frozenset()], "semi-stable": [frozenset()]}
+    # acyclic AFs have a single complete extension; skip that solve
+    ext = _acyclic_extension(args, atts)
+    names = _ALL_ENCODINGS if ext is None else _ALL_ENCODINGS[1:]
+    facts = facts_from_af(args, atts)
+    fams = None
+    if parallel:
+        pool = None
+        try:
+            pool = _get_pool()
+            futs = {name: pool.submit(_solve_models, facts, ENCODING[name]) for name in names}
+            fams = {name: f.result() for name, f in futs.items()}
+        except (BrokenProcessPool, OSError, RuntimeError, NotImplementedError) as e:
+            # pool could not start or a worker died: replace the pool for
+            # later calls, solve this one here
+            print(f"% [WARN] semantics process pool failed ({type(e).__name__}: {e}); solving in-process",
+                  file=sys.stderr)
+            if pool is not None:
+                _drop_pool(pool)
+    if fams is None:
+        fams = {name: _solve_models(facts, ENCODING[name]) for name in names}
+    # families are ordered deterministically (preferred/stable inherit the order
+    # of the complete extensions), so capped listings such as the report's
+    # preferred cards do not depend on the solver's model order
+    comp = _ordered(fams["complete"]) if ext is None else [ext]
+    aset = set(args)
+    succ: dict = {}
+    for u, v in atts:
+        succ.setdefault(u, []).append(v)
+    def covers(S: FrozenSet[str]) -> bool:
+        rng = set(S)
+        for u in S:
+            rng.update(succ.get(u, ()))
+        return aset <= rng
+    return {
+        "grounded":    min(comp, key=len) if args and comp else frozenset(),
+        "preferred":   _maximal(comp),
+        "stable":      [S for S in comp if covers(S)],
+        "complete":    comp,
+        "stage":       _ordered(fams["stage"]),
+        "semi-stable": _ordered(fams["semi-stable"]),
+    }
+
+# Semantics name -> solver; "all" in the CLI walks this in order
+SEMANTICS = {
+    "grounded":    grounded,
+    "preferred":   preferred,
+    "stable":      stable,
+    "complete":    complete,
+    "stage":       stage,
+    "semi-stable": semi_stable,
+    "semistable":  semi_stable,
+}
 
 def credulous(fams: List[FrozenSet[str]], a: str) -> bool:
     return any(a in S for S in fams)
@@ -182,26 +335,9 @@ def main():
 
     # compute semantics
     if args.sem == "all":
-        res = {
-            "grounded": grounded(atoms, atts),
-            "preferred": preferred(atoms, atts),
-            "stable":    stable(atoms, atts),
-            "complete":  complete(atoms, atts),
-            "stage":     stage(atoms, atts),
-            "semi-stable": semi_stable(atoms, atts),
-        }
-    elif args.sem == "grounded":
-        res = grounded(atoms, atts)
-    elif args.sem == "preferred":
-        res = preferred(atoms, atts)
-    elif args.sem == "stable":
-        res = stable(atoms, atts)
-    elif args.sem == "complete":
-        res = complete(atoms, atts)
-    elif args.sem == "stage":
-        res = stage(atoms, atts)
-    else:  # semi-stable / semistable
-        res = semi_stable(atoms, atts)
+        res = all_semantics(atoms, atts)
+    else:
+        res = SEMANTICS[args.sem](atoms, atts)
 
     # query
     query_ans = None
@@ -218,23 +354,23 @@ def main():
     if args.json:
         out = {
             "arguments": atoms,
-            "attacks": sorted(list(atts)),
+            "attacks": sorted(atts),
             "semantics": None
         }
         if args.sem == "all":
             out["semantics"] = {
-                "grounded": sorted(list(res["grounded"])),
-                "preferred": [sorted(list(S)) for S in res["preferred"]],
-                "stable":    [sorted(list(S)) for S in res["stable"]],
-                "complete":  [sorted(list(S)) for S in res["complete"]],
-                "stage":     [sorted(list(S)) for S in res["stage"]],
-                "semi-stable": [sorted(list(S)) for S in res["semi-stable"]],
+                "grounded": sorted(res["grounded"]),
+                "preferred": [sorted(S) for S in res["preferred"]],
+                "stable":    [sorted(S) for S in res["stable"]],
+                "complete":  [sorted(S) for S in res["complete"]],
+                "stage":     [sorted(S) for S in res["stage"]],
+                "semi-stable": [sorted(S) for S in res["semi-stable"]],
             }
         else:
             if isinstance(res, frozenset):
-                out["semantics"] = sorted(list(res))
+                out["semantics"] = sorted(res)
             else:
-                out["semantics"] = [sorted(list(S)) for S in res]
+                out["semantics"] = [sorted(S) for S in res]
         if query_ans is not None:
             out["query"] = {"arg": args.query, "mode": args.mode, "answer": bool(query_ans)}
         print(json.dumps(out, indent=2, ensure_ascii=False))
@@ -252,7 +388,7 @@ def main():
 
     def _show(name: str, sets):
         if isinstance(sets, frozenset):
-            print(f"{name}: "+"{" + ", ".join(sorted(list(sets))) + "}")
+            print(f"{name}: "+"{" + ", ".join(sorted(sets)) + "}")
         else:
             print(f"{name}: " + _format_setset(sets))
 
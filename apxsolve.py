@@ -23,6 +23,7 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import functools
 import itertools
 import json
 import re
@@ -32,20 +33,26 @@ from typing import Dict, List, Set, Tuple, Iterable, FrozenSet, Optional
 # APX parsing
 # ---------------------------
 
-APX_ARG_RE = re.compile(r"\barg\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)\s*\.", re.I)
-APX_ATT_RE = re.compile(r"\batt\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*,\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)\s*\.", re.I)
-APX_COMMENT_RE = re.compile(r"%.*?$", re.M)
+# arg/1 or att/2 in one alternation, so a single scan yields both
+APX_FACT_RE = re.compile(r"\b(?:arg\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)|att\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*,\s*([A-Za-z_][A-Za-z0-9_]*)\s*\))\s*\.", re.I)
+APX_COMMENT_RE = re.compile(r"%[^\n]*")   # to end of line, no lazy per-char $ probe
 
 def read_apx(path: str) -> Tuple[List[str], Set[Tuple[str,str]]]:
     text = open(path, "r", encoding="utf-8").read()
     # Strip '%' comments to avoid false matches
-    text_nc = re.sub(APX_COMMENT_RE, "", text)
-    args = APX_ARG_RE.findall(text_nc)
-    atts = set(APX_ATT_RE.findall(text_nc))
+    text_nc = APX_COMMENT_RE.sub("", text)
+    arg_seen = {}   # dicts preserve order
+    att_seen = {}
+    for a, u, v in APX_FACT_RE.findall(text_nc):
+        if a:
+            arg_seen[a] = None
+        else:
+            att_seen[(u, v)] = None
+    atts = set(att_seen)
     # De-duplicate args and ensure any atom in att(...) is also in args
-    atoms = list(dict.fromkeys(args))  # preserve order
+    atoms = list(arg_seen)
     aset = set(atoms)
-    for (u, v) in atts:
+    for (u, v) in att_seen:
         if u not in aset:
             atoms.append(u); aset.add(u)
         if v not in aset:
@@ -56,10 +63,25 @@ def read_apx(path: str) -> Tuple[List[str], Set[Tuple[str,str]]]:
 # AF core
 # ---------------------------
 
+def _memoized(method):
+    """Cache a no-argument AF enumeration on the instance: the CLI and the
+    insight helpers ask for the same families (preferred, grounded, ...)
+    several times, and each enumeration walks all 2^n subsets."""
+    name = method.__name__
+    @functools.wraps(method)
+    def wrapper(self):
+        try:
+            return self._memo[name]
+        except KeyError:
+            val = self._memo[name] = method(self)
+            return val
+    return wrapper
+
 class AF:
     def __init__(self, atoms: List[str], attacks: Set[Tuple[str,str]]):
         self.arguments: List[str] = list(atoms)
         self.attacks: Set[Tuple[str,str]] = set(attacks)
+        self._memo: Dict[str, object] = {}
         self._attackers: Dict[str, Set[str]] = {a: set() for a in self.arguments}
         self._attackees: Dict[str, Set[str]] = {a: set() for a in self.arguments}
         for (u, v) in self.attacks:
@@ -77,7 +99,7 @@ class AF:
         for a in self.arguments:
             ok = True
             for b in self.attackers(a):
-                if not any((c, b) in self.attacks for c in S):
+                if self.attackers(b).isdisjoint(S):
                     ok = False; break
             if ok:
                 defended.add(a)
@@ -86,14 +108,13 @@ class AF:
     def conflict_free(self, S: Iterable[str]) -> bool:
         Sset = set(S)
         for x in Sset:
-            for y in Sset:
-                if (x, y) in self.attacks:
-                    return False
+            if not self.attackees(x).isdisjoint(Sset):
+                return False
         return True
 
     def defends(self, S: Set[str], a: str) -> bool:
         for b in self.attackers(a):
-            if not any((c, b) in self.attacks for c in S):
+            if self.attackers(b).isdisjoint(S):
                 return False
         return True
 
@@ -121,12 +142,15 @@ class AF:
             for comb in itertools.combinations(A, r):
                 yield frozenset(comb)
 
+    @_memoized
     def all_conflict_free(self) -> List[FrozenSet[str]]:
         return [S for S in self._all_subsets() if self.conflict_free(S)]
 
+    @_memoized
     def all_admissible(self) -> List[FrozenSet[str]]:
         return [S for S in self._all_subsets() if self.admissible(S)]
 
+    @_memoized
     def complete_extensions(self) -> List[FrozenSet[str]]:
         res = []
         for S in self._all_subsets():
@@ -134,6 +158,7 @@ class AF:
                 res.append(S)
         return res
 
+    @_memoized
     def grounded_extension(self) -> FrozenSet[str]:
         S = set()
         while True:
@@ -142,6 +167,7 @@ class AF:
             S = T
         return frozenset(S)
 
+    @_memoized
     def preferred_extensions(self) -> List[FrozenSet[str]]:
         adm = self.all_admissible()
         res = []
@@ -150,6 +176,7 @@ class AF:
                 res.append(S)
         return res
 
+    @_memoized
     def stable_extensions(self) -> List[FrozenSet[str]]:
         res = []
         Aset = set(self.arguments)
@@ -157,24 +184,37 @@ class AF:
             outside = Aset - set(S)
             ok = True
             for x in outside:
-                if not any((s, x) in self.attacks for s in S):
+                if self.attackers(x).isdisjoint(S):
                     ok = False; break
             if ok:
                 res.append(S)
         return res
 
+    @_memoized
     def stage_extensions(self) -> List[FrozenSet[str]]:
         cf = self.all_conflict_free()
         if not cf: return []
         best = max(self.range_size(S) for S in cf) if cf else -1
         return [S for S in cf if self.range_size(S) == best]
 
+    @_memoized
     def semi_stable_extensions(self) -> List[FrozenSet[str]]:
         comp = self.complete_extensions()
         if not comp: return []
         best = max(self.range_size(S) for S in comp) if comp else -1
         return [S for S in comp if self.range_size(S) == best]
 
+# Semantics name -> AF method; "all" in the CLI walks this in order
+SEMANTICS = {
+    "grounded":    AF.grounded_extension,
+    "preferred":   AF.preferred_extensions,
+    "stable":      AF.stable_extensions,
+    "complete":    AF.complete_extensions,
+    "stage":       AF.stage_extensions,
+    "semi-stable": AF.semi_stable_extensions,
+    "semistable":  AF.semi_stable_extensions,
+}
+
 # ---------------------------
 # Insights
 # ---------------------------
@@ -206,7 +246,7 @@ def grounded_roadblocks(af: AF, target: str) -> List[str]:
     # attackers of target that G does not counter-attack
     rb = []
     for b in af.attackers(target):
-        if not any((c, b) in af.attacks for c in G):
+        if af.attackers(b).isdisjoint(G):
             rb.append(b)
     return sorted(rb)
 
@@ -273,29 +313,12 @@ def main():
 
     # Compute semantics
     def compute_all():
-        return {
-            "grounded": af.grounded_extension(),
-            "preferred": af.preferred_extensions(),
-            "stable": af.stable_extensions(),
-            "complete": af.complete_extensions(),
-            "stage": af.stage_extensions(),
-            "semi-stable": af.semi_stable_extensions(),
-        }
+        return {name: fn(af) for name, fn in SEMANTICS.items() if name != "semistable"}
 
     if args.sem == "all":
         res = compute_all()
-    elif args.sem == "grounded":
-        res = af.grounded_extension()
-    elif args.sem == "preferred":
-        res = af.preferred_extensions()
-    elif args.sem == "stable":
-        res = af.stable_extensions()
-    elif args.sem == "complete":
-        res = af.complete_extensions()
-    elif args.sem == "stage":
-        res = af.stage_extensions()
-    else:  # semi-stable
-        res = af.semi_stable_extensions()
+    else:
+        res = SEMANTICS[args.sem](af)
 
     # Query
     query_ans = None
@@ -321,36 +344,36 @@ def main():
             persistent, soft = preferred_persistent_soft_attackers(af, tgt)
         insight_obj = {
             "target": tgt,
-            "grounded": sorted(list(G)),
+            "grounded": sorted(G),
             "preferred_count": len(pref),
             "stable_count": len(stbl),
             "depth": {a: depth[a] for a in atoms},
             "roadblocks_grounded": (grounded_roadblocks(af, tgt) if tgt else []),
-            "preferred_persistent_attackers_of_target": sorted(list(persistent)),
-            "preferred_soft_attackers_of_target": sorted(list(soft)),
+            "preferred_persistent_attackers_of_target": sorted(persistent),
+            "preferred_soft_attackers_of_target": sorted(soft),
         }
 
     # Output
     if args.json:
         out = {
             "arguments": atoms,
-            "attacks": sorted(list(atts)),
+            "attacks": sorted(atts),
             "semantics": None,
         }
         if args.sem == "all":
             out["semantics"] = {
-                "grounded": sorted(list(res["grounded"])),
-                "preferred": [sorted(list(S)) for S in res["preferred"]],
-                "stable": [sorted(list(S)) for S in res["stable"]],
-                "complete": [sorted(list(S)) for S in res["complete"]],
-                "stage": [sorted(list(S)) for S in res["stage"]],
-                "semi-stable": [sorted(list(S)) for S in res["semi-stable"]],
+                "grounded": sorted(res["grounded"]),
+                "preferred": [sorted(S) for S in res["preferred"]],
+                "stable": [sorted(S) for S in res["stable"]],
+                "complete": [sorted(S) for S in res["complete"]],
+                "stage": [sorted(S) for S in res["stage"]],
+                "semi-stable": [sorted(S) for S in res["semi-stable"]],
             }
         else:
             if isinstance(res, frozenset):
-                out["semantics"] = sorted(list(res))
+                out["semantics"] = sorted(res)
             elif isinstance(res, list):
-                out["semantics"] = [sorted(list(S)) for S in res]
+                out["semantics"] = [sorted(S) for S in res]
             else:
                 out["semantics"] = res
         if query_ans is not None:
@@ -372,7 +395,7 @@ def main():
 
     def show_sets(name: str, sets):
         if isinstance(sets, frozenset):
-            print(f"{name}: " + "{" + ", ".join(sorted(list(sets))) + "}")
+            print(f"{name}: " + "{" + ", ".join(sorted(sets)) + "}")
         else:
             print(f"{name}: " + format_setset(sets))
 
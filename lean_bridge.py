@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 from logical_form_core import LFCore
+from collections import deque
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional, Set
 import textwrap, tempfile, subprocess, os
@@ -59,7 +60,6 @@ def _bfs_chain(starts: Set[str], goal: str, edges: List[Tuple[str,str]]) -> Opti
     for a,b in edges:
         adj.setdefault(a, []).append(b)
 
-    from collections import deque
     q = deque()
     prev: Dict[str, Optional[str]] = {}
 
@@ -90,12 +90,14 @@ def _render_lean(chain: List[str], used_edges: List[Tuple[str,str]], facts: List
     We generate a constructive proof via 'have' steps—no external libraries needed.
     """
     # Unique atoms appearing in the theorem’s types
-    atoms: List[str] = []
+    # (dict keys keep first-seen order without rescanning the list per atom)
+    seen_atoms: Dict[str, None] = {}
     for a,b in used_edges:
-        if a not in atoms: atoms.append(a)
-        if b not in atoms: atoms.append(b)
+        seen_atoms[a] = None
+        seen_atoms[b] = None
     for f in facts:
-        if f not in atoms: atoms.append(f)
+        seen_atoms[f] = None
+    atoms: List[str] = list(seen_atoms)
 
     lean_atoms = [ _mangle(a) for a in atoms ]
     lean_edges = [ (_mangle(a), _mangle(b)) for (a,b) in used_edges ]
@@ -204,7 +206,6 @@ def verify_ui_with_lean(pred_P: str, pred_Q: str, const: str,
     Verify ∀x, P x -> Q x  and  P c   ⊢  Q c
     Generates a Lean file that should work in both Lean 3 and Lean 4.
     """
-    import tempfile, os, subprocess
 
     def _mangle(s: str) -> str:
         # ASCII-only, Lean-safe identifier
@@ -253,7 +254,6 @@ theorem {thm} (h : forall x : T, {P} x -> {Q} x) (hp : {P} {c}) : {Q} {c} :=
 
 def verify_mt_with_lean(p_name: str = "P", q_name: str = "Q",
                         name: str = "mt_check", lean_cmd: str = "lean"):
-    import tempfile, os, subprocess
     def m(s: str):
         out = "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in s)
         if not out: out = "X"
@@ -281,7 +281,6 @@ theorem {thm} (hPQ : {P} -> {Q}) (hnQ : {Q} -> False) : {P} -> False :=
 
 def verify_all_chain_with_lean(pred_A: str, pred_B: str, pred_C: str,
                                name: str = "all_chain", lean_cmd: str = "lean"):
-    import tempfile, os, subprocess
     def m(s: str):
         out = "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in s)
         if not out: out = "X"
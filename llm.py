@@ -25,13 +25,25 @@ Usage:
   # Explicit override (works in any context)
   client = init_llm_client(api_key="explicit-key")
 
+  # Reuse one client per resolved key/project across calls in this process
+  client = get_shared_llm_client()
+
+  # Per-configuration component for in-process caches of LLM results
+  cache_key = (llm_config_digest(), prompt)
+
   # API calls (cached if CACHE_LLM is set)
   response = generate_content(client, model="gemini-2.5-flash", contents=prompt, config=config)
+
+  # Same call from async code (runs in a worker thread, shares the cache)
+  response = await generate_content_async(client, contents=prompt, config=config)
 """
 import os
+import asyncio
 import hashlib
 import json
+import threading
 from typing import Optional, Union, Any
+from collections import OrderedDict
 from contextvars import ContextVar
 
 # Add caching imports
@@ -153,6 +165,52 @@ def get_llm_client_or_none(api_key: Optional[str] = None,
     return init_llm_client(api_key=api_key, project=project, location=location, required=False)
 
 
+def _resolved_config() -> tuple:
+    """What init_llm_client() would use here: (API key, GCP project, location)."""
+    return (get_request_api_key() or os.getenv('GEMINI_API_KEY'),
+            os.getenv('GOOGLE_CLOUD_PROJECT'),
+            os.getenv('GOOGLE_CLOUD_LOCATION', "us-central1"))
+
+
+def llm_config_digest() -> str:
+    """
+    Hash of the resolved LLM configuration (request-scoped key, GEMINI_API_KEY,
+    or GCP project/location). In-process caches of LLM results include it in
+    their keys so that results paid for with one caller's key are never served
+    to a caller with another key, or with none.
+    """
+    return hashlib.blake2b(repr(_resolved_config()).encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Clients reused by get_shared_llm_client, keyed by resolved configuration
+_SHARED_CLIENTS_MAX = 16
+_shared_clients: "OrderedDict[tuple, Any]" = OrderedDict()
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_llm_client():
+    """
+    Like init_llm_client(), but reuses one client per resolved configuration
+    (request-scoped key, GEMINI_API_KEY, or GCP project/location) within the
+    process, so repeated pipelines skip client setup. Keyed on the resolved
+    configuration so a request-scoped key never gets another caller's client.
+    """
+    key = _resolved_config()
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is not None:
+            _shared_clients.move_to_end(key)
+            return client
+    client = init_llm_client()
+    with _shared_clients_lock:
+        # keep the first client if another thread got there meanwhile
+        client = _shared_clients.setdefault(key, client)
+        _shared_clients.move_to_end(key)
+        if len(_shared_clients) > _SHARED_CLIENTS_MAX:
+            _shared_clients.popitem(last=False)
+    return client
+
+
 def generate_content(client, contents: Union[str, list], config=None, model: str = LLM_MODEL):
     """
     Cached wrapper for client.models.generate_content calls.
@@ -193,3 +251,12 @@ def generate_content(client, contents: Union[str, list], config=None, model: str
     
     return Response(cached_text)
 
+
+async def generate_content_async(client, contents: Union[str, list], config=None, model: str = LLM_MODEL):
+    """
+    Async counterpart of generate_content.
+
+    The blocking call runs in a worker thread so that several requests can be
+    in flight at once while still going through the same cache.
+    """
+    return await asyncio.to_thread(generate_content, client, contents, config, model)
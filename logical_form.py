@@ -6,22 +6,39 @@ Logical Form Analyzer
 - Certification with Lean theorem prover
 """
 
+import asyncio
 import clingo
+from clingo import Function, Number
+from functools import lru_cache
 from logical_form_core import lf_to_core
 from lean_bridge import Subgoal, verify_with_lean, verify_ui_with_lean, verify_mt_with_lean, verify_all_chain_with_lean
-from llm import init_llm_client, generate_content
+from llm import init_llm_client, generate_content, generate_content_async
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Literal, Union
 from google.genai import types
 import json
+import os
 import re
+import sys
 from fol_e import check_entailment_fof
 from argfol.digest import render_generic_digest
 
+# Optional faster JSON decoding for LLM responses
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # ============================================================================
 # FOL STRUCTURE (using dataclasses)
 # ============================================================================
 
+# Formula type tags, grouped by arity (membership tests on hot paths)
+_BINARY_TYPES = frozenset({"and", "or", "implies", "iff"})
+_QUANTIFIER_TYPES = frozenset({"forall", "exists"})
+_BINARY_SYMBOLS = {"and": "∧", "or": "∨", "implies": "→", "iff": "↔"}
+
 @dataclass
 class FOLAtom:
     """Atomic formula: predicate(term1, term2, ...)"""
@@ -55,10 +72,9 @@ class FOLFormula:
             return self.atom.to_string()
         elif self.type == "not" and self.left:
             return f"¬{self.left.to_string()}"
-        elif self.type in ["and", "or", "implies", "iff"] and self.left and self.right:
-            symbols = {"and": "∧", "or": "∨", "implies": "→", "iff": "↔"}
-            return f"({self.left.to_string()} {symbols[self.type]} {self.right.to_string()})"
-        elif self.type in ["forall", "exists"] and self.variable and self.body:
+        elif self.type in _BINARY_TYPES and self.left and self.right:
+            return f"({self.left.to_string()} {_BINARY_SYMBOLS[self.type]} {self.right.to_string()})"
+        elif self.type in _QUANTIFIER_TYPES and self.variable and self.body:
             symbol = "∀" if self.type == "forall" else "∃"
             return f"{symbol}{self.variable}({self.body.to_string()})"
         return "?"
@@ -83,6 +99,223 @@ class LogicalArgument:
     inferences: List[LogicalInference]
     goal_id: Optional[str] = None
 
+# Statement ids, predicate names and terms repeat across facts; share one
+# (immutable) clingo String symbol per distinct value instead of rebuilding it.
+String = lru_cache(maxsize=4096)(clingo.String)
+
+# ============================================================================
+# ASP DETECTOR RULES (static; per-argument facts are added separately)
+# ============================================================================
+
+# Each detector is emitted only when the argument contains the constructs its
+# body needs (see _asp_rules_for); a detector whose preconditions are absent
+# could never fire, so leaving it out only saves grounding work.
+# Features: "implies", "negation", "forall", "exists", "fol_atom".
+
+_ASP_RULES_HEADER = """% ============================================================================
+% PATTERN DETECTION RULES
+% ============================================================================
+
+% Helper: check if an inference uses two specific premises (order-insensitive).
+inference_from_both(To, S1, S2) :-
+    inference_from(To, S1),
+    inference_from(To, S2),
+    S1 != S2.
+"""
+
+_ASP_DETECTORS: List[tuple] = [
+    # ------------------------------------------------------------------------
+    # Valid patterns
+    # ------------------------------------------------------------------------
+    (frozenset({"implies"}), """
+% Modus Ponens: P→Q, P ⊢ Q
+valid_modus_ponens(Simp, Sprem, Sgoal) :-
+    binary(_, Simp, "implies", _, _),
+    statement(Sprem),
+    statement(Sgoal),
+    inference_from_both(Sgoal, Simp, Sprem),
+    inference_pattern(Sgoal, "modus_ponens").
+#show valid_modus_ponens/3.
+"""),
+    (frozenset({"implies", "negation"}), """
+% Modus Tollens: P→Q, ¬Q ⊢ ¬P
+valid_modus_tollens(Simp, SnegQ, SnegP) :-
+    binary(_, Simp, "implies", _, _),
+    negation(_, SnegQ, _),
+    negation(_, SnegP, _),
+    inference_from_both(SnegP, Simp, SnegQ),
+    inference_pattern(SnegP, "modus_tollens").
+#show valid_modus_tollens/3.
+"""),
+    (frozenset({"forall"}), """
+% Universal Instantiation (UI): ∀x (P x → Q x), P c ⊢ Q c
+% Keep 2-arity output (∀-statement, goal) but *require* that the inference
+% cites both the ∀-premise and some instance premise.
+valid_universal_instantiation(Sforall, Sgoal) :-
+    quantifier(_, Sforall, "forall", _, _),
+    statement(Sgoal),
+    inference_from_both(Sgoal, Sforall, Sinst),
+    statement(Sinst),
+    inference_pattern(Sgoal, "universal_instantiation").
+#show valid_universal_instantiation/2.
+"""),
+    (frozenset({"forall"}), """
+% Universal syllogism / chain:
+% ∀x (A→B), ∀x (B→C) ⊢ ∀x (A→C)
+% Accept both labels by using two rules with the same head.
+
+valid_syllogism(S1, S2, S3) :-
+    quantifier(_, S1, "forall", _, _),
+    quantifier(_, S2, "forall", _, _),
+    quantifier(_, S3, "forall", _, _),
+    inference_from_both(S3, S1, S2),
+    inference_pattern(S3, "syllogism").
+
+valid_syllogism(S1, S2, S3) :-
+    quantifier(_, S1, "forall", _, _),
+    quantifier(_, S2, "forall", _, _),
+    quantifier(_, S3, "forall", _, _),
+    inference_from_both(S3, S1, S2),
+    inference_pattern(S3, "hypothetical_syllogism").
+#show valid_syllogism/3.
+"""),
+    (frozenset({"exists", "fol_atom"}), """
+% Existential Generalization (EG): P(c) ⊢ ∃x P(x)
+valid_existential_generalization(Sinst, Sexists) :-
+    fol_atom(_, Sinst, _),
+    quantifier(_, Sexists, "exists", _, _),
+    inference_from(Sexists, Sinst),
+    inference_pattern(Sexists, "existential_generalization").
+#show valid_existential_generalization/2.
+"""),
+    (frozenset({"forall", "implies", "fol_atom"}), """
+% UI + MP, label‑agnostic:
+% ∀x (L(x) -> R(x)), L(c)  ⊢  R(c)
+valid_ui_mp(Sforall, Sinst, Sgoal) :-
+    % Find a universal with an -> body
+    quantifier( QID, Sforall, "forall", V, BodyID ),
+    binary( BodyID, Sforall, "implies", LID, RID ),
+    fol_atom( LID, Sforall, PL ),     % left predicate name
+    fol_atom( RID, Sforall, PR ),     % right predicate name
+
+    % The instance premise has PL at the same argument position with a constant C
+    fol_atom( InstID, Sinst, PL ),
+    has_var( LID, Pos, V ),
+    has_const( InstID, Pos, C ),
+
+    % The goal has PR with the same constant C at the same argument position
+    fol_atom( GoalID, Sgoal, PR ),
+    has_var( RID, Pos, V ),
+    has_const( GoalID, Pos, C ),
+
+    % The inference actually cites these two premises
+    inference_from_both( Sgoal, Sforall, Sinst ).
+#show valid_ui_mp/3.
+"""),
+    # ------------------------------------------------------------------------
+    # Fallacies
+    # ------------------------------------------------------------------------
+    (frozenset({"implies"}), """
+% Affirming the Consequent: P→Q, Q ⊢ P
+fallacy_affirming_consequent(Simp, Sq, Sp) :-
+    binary(_, Simp, "implies", _, _),
+    statement(Sq),
+    statement(Sp),
+    inference_from_both(Sp, Simp, Sq),
+    inference_pattern(Sp, "affirming_consequent").
+#show fallacy_affirming_consequent/3.
+"""),
+    (frozenset({"implies", "negation"}), """
+% Denying the Antecedent: P→Q, ¬P ⊢ ¬Q
+fallacy_denying_antecedent(Simp, SnegP, SnegQ) :-
+    binary(_, Simp, "implies", _, _),
+    negation(_, SnegP, _),
+    negation(_, SnegQ, _),
+    inference_from_both(SnegQ, Simp, SnegP),
+    inference_pattern(SnegQ, "denying_antecedent").
+#show fallacy_denying_antecedent/3.
+"""),
+    (frozenset({"forall", "fol_atom"}), """
+% Hasty Generalization: P(c) ⊢ ∀x P(x)
+fallacy_hasty_generalization(Sinst, Sforall) :-
+    fol_atom(_, Sinst, _),
+    has_const(_, _, _),
+    quantifier(_, Sforall, "forall", _, _),
+    inference_from(Sforall, Sinst),
+    inference_pattern(Sforall, "hasty_generalization").
+#show fallacy_hasty_generalization/2.
+"""),
+]
+
+# Only the specific valid/fallacy predicates above are shown (no generic
+# invalid_inference); with no applicable detector, show nothing at all.
+_ASP_SHOW_NONE = "\n#show.\n"
+
+def _asp_features(facts: List[clingo.Symbol]) -> set:
+    """Constructs present in an argument's facts, as used by _ASP_DETECTORS."""
+    features = set()
+    for fact in facts:
+        if fact.name in ("binary", "quantifier"):
+            features.add(fact.arguments[2].string)
+        elif fact.name in ("negation", "fol_atom"):
+            features.add(fact.name)
+    return features
+
+# Shown predicate -> (is_issue, result type, description template over its arguments).
+# valid_universal_instantiation is handled separately: it needs the argument's
+# inferences to name the instance premise.
+_SHOWN_RESULTS: Dict[str, tuple] = {
+    "valid_modus_ponens": (False, "modus_ponens", "Valid modus ponens: [{0}, {1}] → {2}"),
+    "valid_modus_tollens": (False, "modus_tollens", "Valid modus tollens: [{0}, {1}] → {2}"),
+    "fallacy_affirming_consequent": (True, "affirming_consequent", "Fallacy - Affirming the consequent: [{0}, {1}] → {2}"),
+    "fallacy_denying_antecedent": (True, "denying_antecedent", "Fallacy - Denying the antecedent: [{0}, {1}] → {2}"),
+    "valid_syllogism": (False, "syllogism", "Valid syllogism: [{0}, {1}] → {2}"),
+    "fallacy_hasty_generalization": (True, "hasty_generalization", "Fallacy - Hasty generalization: {0} → {1}"),
+    "invalid_inference": (True, "invalid_pattern", "Invalid inference pattern '{1}' for statement {0}"),
+    "valid_ui_mp": (False, "universal_instantiation", "Valid universal instantiation: [{0}, {1}] → {2}"),
+}
+
+def _sym_text(sym: clingo.Symbol) -> str:
+    return sym.string if sym.type == clingo.SymbolType.String else str(sym)
+
+def _collect_shown(shown: List[clingo.Symbol], argument: LogicalArgument,
+                   issues: List[Dict], valid_inferences: List[Dict]) -> None:
+    """Turn the shown detector atoms of a model into issue / valid-inference entries."""
+    for atom in shown:
+        atom_name = atom.name
+        args = [_sym_text(arg) for arg in atom.arguments]
+        
+        if atom_name == "valid_universal_instantiation":
+            s_forall, s_goal = args
+            # Find the instance premise among the cited from_ids for this goal
+            inst = "?"
+            for inf in argument.inferences:
+                if inf.to_id == s_goal and s_forall in inf.from_ids:
+                    others = [x for x in inf.from_ids if x != s_forall]
+                    if others:
+                        inst = others[0]
+                    break
+            valid_inferences.append({
+                "type": "universal_instantiation",
+                "description": f"Valid universal instantiation: [{s_forall}, {inst}] → {s_goal}"
+            })
+            continue
+        
+        entry = _SHOWN_RESULTS.get(atom_name)
+        if entry is None:
+            continue
+        is_issue, result_type, template = entry
+        (issues if is_issue else valid_inferences).append({
+            "type": result_type,
+            "description": template.format(*args)
+        })
+
+@lru_cache(maxsize=None)
+def _asp_rules_for(features: frozenset) -> str:
+    """Detector rules whose preconditions are all in `features`."""
+    selected = [rules for required, rules in _ASP_DETECTORS if required <= features]
+    return _ASP_RULES_HEADER + ("".join(selected) if selected else _ASP_SHOW_NONE)
+
 # ============================================================================
 # LOGICAL ANALYZER
 # ============================================================================
@@ -90,9 +323,23 @@ class LogicalArgument:
 class LogicalAnalyzer:
     """Analyzes logical form of arguments using FOL"""
     
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, parallel: bool = False, threads: Optional[int] = None,
+                 verbose: bool = True):
         self.client = init_llm_client()
         self.debug = debug
+        self.verbose = verbose  # progress/structure output in debug_argument
+        # clingo solver options; parallel search (-t N) only pays off on large
+        # grounded programs, so it is opt-in
+        self._clingo_args = ["--warn=none"]
+        if parallel:
+            n = threads or os.cpu_count() or 1
+            if n > 1:
+                self._clingo_args.insert(0, f"-t{n}")
+        # The generation config is the same for every call; build it once
+        self._gen_config = types.GenerateContentConfig(
+            temperature=0.1,
+            response_mime_type="application/json"
+        )
     
     def parse_formula_json(self, formula_dict: dict) -> FOLFormula:
         """Parse JSON formula representation to FOLFormula object"""
@@ -111,13 +358,13 @@ class LogicalAnalyzer:
                 type="not",
                 left=self.parse_formula_json(formula_dict["formula"])
             )
-        elif formula_type in ["and", "or", "implies", "iff"]:
+        elif formula_type in _BINARY_TYPES:
             return FOLFormula(
                 type=formula_type,
                 left=self.parse_formula_json(formula_dict["left"]),
                 right=self.parse_formula_json(formula_dict["right"])
             )
-        elif formula_type in ["forall", "exists"]:
+        elif formula_type in _QUANTIFIER_TYPES:
             return FOLFormula(
                 type=formula_type,
                 variable=formula_dict["variable"],
@@ -128,8 +375,24 @@ class LogicalAnalyzer:
     
     def extract_logical_form(self, argument_text: str) -> LogicalArgument:
         """Extract FOL structure from natural language"""
-        
-        prompt = f"""
+        response = generate_content(
+            self.client,
+            contents=self._logical_form_prompt(argument_text),
+            config=self._gen_config
+        )
+        return self._parse_logical_form_response(response.text)
+
+    async def extract_logical_form_async(self, argument_text: str) -> LogicalArgument:
+        """Async variant of extract_logical_form, for issuing several extractions concurrently"""
+        response = await generate_content_async(
+            self.client,
+            contents=self._logical_form_prompt(argument_text),
+            config=self._gen_config
+        )
+        return self._parse_logical_form_response(response.text)
+
+    def _logical_form_prompt(self, argument_text: str) -> str:
+        return f"""
         Convert this argument to First-Order Logic using a JSON representation.
         
         Argument: {argument_text}
@@ -172,20 +435,10 @@ class LogicalAnalyzer:
         denying_antecedent, universal_instantiation, syllogism, hasty_generalization, 
         existential_generalization, disjunctive_syllogism, hypothetical_syllogism
         """
-        
-        config = types.GenerateContentConfig(
-            temperature=0.1,
-            response_mime_type="application/json"
-        )
-        
-        response = generate_content(
-            self.client,
-            contents=prompt,
-            config=config
-        )
-        
+
+    def _parse_logical_form_response(self, text: str) -> LogicalArgument:
         # Parse JSON response
-        data = json.loads(response.text)
+        data = _json_loads(text)
         
         # Convert to dataclass objects
         statements = []
@@ -210,298 +463,107 @@ class LogicalAnalyzer:
             goal_id=data.get("goal_id")
         )
     
-    def formula_to_asp_facts(self, formula: FOLFormula, stmt_id: str, fact_counter: List[int]) -> str:
-        """Convert FOL formula to ASP facts"""
-        asp = ""
+    def formula_to_asp_facts(self, formula: FOLFormula, stmt_id: str, fact_counter: List[int],
+                             facts: List[clingo.Symbol]) -> None:
+        """Convert FOL formula to ASP facts (appended to `facts` as clingo symbols)"""
         fact_id = fact_counter[0]
         fact_counter[0] += 1
+        sid = String(stmt_id)
         
         if formula.type == "atom" and formula.atom:
             atom = formula.atom
             if not atom.terms:  # Propositional
-                asp += f'prop_atom({fact_id}, "{stmt_id}", "{atom.predicate}").\n'
+                facts.append(Function("prop_atom", [Number(fact_id), sid, String(atom.predicate)]))
             else:
-                asp += f'fol_atom({fact_id}, "{stmt_id}", "{atom.predicate}").\n'
+                facts.append(Function("fol_atom", [Number(fact_id), sid, String(atom.predicate)]))
                 for i, term in enumerate(atom.terms):
                     if term in ['x', 'y', 'z']:  # Variable
-                        asp += f'has_var({fact_id}, {i}, "{term}").\n'
+                        facts.append(Function("has_var", [Number(fact_id), Number(i), String(term)]))
                     else:  # Constant
-                        asp += f'has_const({fact_id}, {i}, "{term}").\n'
+                        facts.append(Function("has_const", [Number(fact_id), Number(i), String(term)]))
         
         elif formula.type == "not" and formula.left:
             inner_id = fact_counter[0]
-            asp += f'negation({fact_id}, "{stmt_id}", {inner_id}).\n'
-            asp += self.formula_to_asp_facts(formula.left, stmt_id, fact_counter)
+            facts.append(Function("negation", [Number(fact_id), sid, Number(inner_id)]))
+            self.formula_to_asp_facts(formula.left, stmt_id, fact_counter, facts)
         
-        elif formula.type in ["and", "or", "implies", "iff"] and formula.left and formula.right:
+        elif formula.type in _BINARY_TYPES and formula.left and formula.right:
             left_id = fact_counter[0]
             fact_counter[0] += 1
             right_id = fact_counter[0]
-            asp += f'binary({fact_id}, "{stmt_id}", "{formula.type}", {left_id}, {right_id}).\n'
-            asp += self.formula_to_asp_facts(formula.left, stmt_id, fact_counter)
-            asp += self.formula_to_asp_facts(formula.right, stmt_id, fact_counter)
+            facts.append(Function("binary", [Number(fact_id), sid, String(formula.type),
+                                             Number(left_id), Number(right_id)]))
+            self.formula_to_asp_facts(formula.left, stmt_id, fact_counter, facts)
+            self.formula_to_asp_facts(formula.right, stmt_id, fact_counter, facts)
         
-        elif formula.type in ["forall", "exists"] and formula.variable and formula.body:
+        elif formula.type in _QUANTIFIER_TYPES and formula.variable and formula.body:
             body_id = fact_counter[0]
-            asp += f'quantifier({fact_id}, "{stmt_id}", "{formula.type}", "{formula.variable}", {body_id}).\n'
-            asp += self.formula_to_asp_facts(formula.body, stmt_id, fact_counter)
-        
-        return asp
+            facts.append(Function("quantifier", [Number(fact_id), sid, String(formula.type),
+                                                 String(formula.variable), Number(body_id)]))
+            self.formula_to_asp_facts(formula.body, stmt_id, fact_counter, facts)
     
-    def build_asp_program(self, argument: LogicalArgument) -> str:
-        """Convert logical argument to ASP program"""
-        
-        program = "% Logical statements as FOL formulas\n"
+    def build_asp_facts(self, argument: LogicalArgument) -> List[clingo.Symbol]:
+        """Convert logical argument to ASP facts, as clingo symbols"""
+        facts: List[clingo.Symbol] = []
         fact_counter = [1]  # Mutable counter for fact IDs
         
         # Convert each statement's formula to ASP facts
         for stmt in argument.statements:
-            program += f'\n% Statement {stmt.id}: {stmt.formula.to_string()}\n'
-            program += f'statement("{stmt.id}").\n'
-            program += self.formula_to_asp_facts(stmt.formula, stmt.id, fact_counter)
+            facts.append(Function("statement", [String(stmt.id)]))
+            self.formula_to_asp_facts(stmt.formula, stmt.id, fact_counter, facts)
         
         # Add inferences
-        program += "\n% Inferences\n"
         for inf in argument.inferences:
             for from_id in inf.from_ids:
-                program += f'inference_from("{inf.to_id}", "{from_id}").\n'
-            program += f'inference_pattern("{inf.to_id}", "{inf.pattern}").\n'
+                facts.append(Function("inference_from", [String(inf.to_id), String(from_id)]))
+            facts.append(Function("inference_pattern", [String(inf.to_id), String(inf.pattern)]))
         
         # Add goal if present
         if argument.goal_id:
-            program += f'\n% Goal\ngoal("{argument.goal_id}").\n'
-        
-        # Add analysis rules
-        program += """
-
-% ============================================================================
-% PATTERN DETECTION RULES
-% ============================================================================
-
-% Helper: check if an inference uses two specific premises (order-insensitive).
-inference_from_both(To, S1, S2) :-
-    inference_from(To, S1),
-    inference_from(To, S2),
-    S1 != S2.
-
-% ----------------------------------------------------------------------------
-% Valid patterns
-% ----------------------------------------------------------------------------
-
-% Modus Ponens: P→Q, P ⊢ Q
-valid_modus_ponens(Simp, Sprem, Sgoal) :-
-    binary(_, Simp, "implies", _, _),
-    statement(Sprem),
-    statement(Sgoal),
-    inference_from_both(Sgoal, Simp, Sprem),
-    inference_pattern(Sgoal, "modus_ponens").
-
-% Modus Tollens: P→Q, ¬Q ⊢ ¬P
-valid_modus_tollens(Simp, SnegQ, SnegP) :-
-    binary(_, Simp, "implies", _, _),
-    negation(_, SnegQ, _),
-    negation(_, SnegP, _),
-    inference_from_both(SnegP, Simp, SnegQ),
-    inference_pattern(SnegP, "modus_tollens").
-
-% Universal Instantiation (UI): ∀x (P x → Q x), P c ⊢ Q c
-% Keep 2-arity output (∀-statement, goal) but *require* that the inference
-% cites both the ∀-premise and some instance premise.
-valid_universal_instantiation(Sforall, Sgoal) :-
-    quantifier(_, Sforall, "forall", _, _),
-    statement(Sgoal),
-    inference_from_both(Sgoal, Sforall, Sinst),
-    statement(Sinst),
-    inference_pattern(Sgoal, "universal_instantiation").
-
-% Universal syllogism / chain:
-% ∀x (A→B), ∀x (B→C) ⊢ ∀x (A→C)
-% Accept both labels by using two rules with the same head.
-
-valid_syllogism(S1, S2, S3) :-
-    quantifier(_, S1, "forall", _, _),
-    quantifier(_, S2, "forall", _, _),
-    quantifier(_, S3, "forall", _, _),
-    inference_from_both(S3, S1, S2),
-    inference_pattern(S3, "syllogism").
-
-valid_syllogism(S1, S2, S3) :-
-    quantifier(_, S1, "forall", _, _),
-    quantifier(_, S2, "forall", _, _),
-    quantifier(_, S3, "forall", _, _),
-    inference_from_both(S3, S1, S2),
-    inference_pattern(S3, "hypothetical_syllogism").
-
-% Existential Generalization (EG): P(c) ⊢ ∃x P(x)
-valid_existential_generalization(Sinst, Sexists) :-
-    fol_atom(_, Sinst, _),
-    quantifier(_, Sexists, "exists", _, _),
-    inference_from(Sexists, Sinst),
-    inference_pattern(Sexists, "existential_generalization").
-
-% UI + MP, label‑agnostic:
-% ∀x (L(x) -> R(x)), L(c)  ⊢  R(c)
-valid_ui_mp(Sforall, Sinst, Sgoal) :-
-    % Find a universal with an -> body
-    quantifier( QID, Sforall, "forall", V, BodyID ),
-    binary( BodyID, Sforall, "implies", LID, RID ),
-    fol_atom( LID, Sforall, PL ),     % left predicate name
-    fol_atom( RID, Sforall, PR ),     % right predicate name
-
-    % The instance premise has PL at the same argument position with a constant C
-    fol_atom( InstID, Sinst, PL ),
-    has_var( LID, Pos, V ),
-    has_const( InstID, Pos, C ),
-
-    % The goal has PR with the same constant C at the same argument position
-    fol_atom( GoalID, Sgoal, PR ),
-    has_var( RID, Pos, V ),
-    has_const( GoalID, Pos, C ),
-
-    % The inference actually cites these two premises
-    inference_from_both( Sgoal, Sforall, Sinst ).
-
-% ----------------------------------------------------------------------------
-% Fallacies
-% ----------------------------------------------------------------------------
-
-% Affirming the Consequent: P→Q, Q ⊢ P
-fallacy_affirming_consequent(Simp, Sq, Sp) :-
-    binary(_, Simp, "implies", _, _),
-    statement(Sq),
-    statement(Sp),
-    inference_from_both(Sp, Simp, Sq),
-    inference_pattern(Sp, "affirming_consequent").
-
-% Denying the Antecedent: P→Q, ¬P ⊢ ¬Q
-fallacy_denying_antecedent(Simp, SnegP, SnegQ) :-
-    binary(_, Simp, "implies", _, _),
-    negation(_, SnegP, _),
-    negation(_, SnegQ, _),
-    inference_from_both(SnegQ, Simp, SnegP),
-    inference_pattern(SnegQ, "denying_antecedent").
-
-% Hasty Generalization: P(c) ⊢ ∀x P(x)
-fallacy_hasty_generalization(Sinst, Sforall) :-
-    fol_atom(_, Sinst, _),
-    has_const(_, _, _),
-    quantifier(_, Sforall, "forall", _, _),
-    inference_from(Sforall, Sinst),
-    inference_pattern(Sforall, "hasty_generalization").
-
-% ----------------------------------------------------------------------------
-% Show only specific valid/fallacy predicates (no generic invalid_inference).
-% ----------------------------------------------------------------------------
-#show valid_modus_ponens/3.
-#show valid_modus_tollens/3.
-#show valid_universal_instantiation/2.
-#show valid_syllogism/3.
-#show valid_existential_generalization/2.
-#show fallacy_affirming_consequent/3.
-#show fallacy_denying_antecedent/3.
-#show fallacy_hasty_generalization/2.
-#show valid_ui_mp/3.
-        """
+            facts.append(Function("goal", [String(argument.goal_id)]))
         
+        return facts
+    
+    def build_asp_program(self, argument: LogicalArgument) -> str:
+        """Render the full ASP program (facts + detector rules) as text, e.g. for --debug"""
+        program = "% Logical statements as FOL formulas\n"
+        for stmt in argument.statements:
+            program += f'% Statement {stmt.id}: {stmt.formula.to_string()}\n'
+        program += "\n"
+        facts = self.build_asp_facts(argument)
+        program += "".join(f"{fact}.\n" for fact in facts)
+        program += "\n" + _asp_rules_for(frozenset(_asp_features(facts)))
         return program
     
     def analyze(self, argument: LogicalArgument) -> Dict:
         """Analyze logical argument using ASP"""
         
-        asp_program = self.build_asp_program(argument)
-        
         if self.debug:
             print("=== ASP Program ===")
-            print(asp_program)
+            print(self.build_asp_program(argument))
             print("==================")
         
-        # Run ASP solver
-        control = clingo.Control(["--warn=none"])
-        control.add("base", [], asp_program)
+        # Run ASP solver: parse only the static rules; the argument's facts
+        # go straight into the atom base through the backend
+        facts = self.build_asp_facts(argument)
+        control = clingo.Control(self._clingo_args)
+        control.add("base", [], _asp_rules_for(frozenset(_asp_features(facts))))
+        with control.backend() as backend:
+            for fact in facts:
+                backend.add_rule([backend.add_atom(fact)])
         control.ground([("base", [])])
         
-        issues = []
-        valid_inferences = []
+        issues: List[Dict] = []
+        valid_inferences: List[Dict] = []
         
         with control.solve(yield_=True) as handle:
             for model in handle:
+                # Only the #show'n detector atoms are needed; fetch them once
+                shown = model.symbols(shown=True)
                 if self.debug:
-                    print(f"Model: {[str(atom) for atom in model.symbols(shown=True)]}")
+                    print(f"Model: {[str(atom) for atom in shown]}")
                 
-                for atom in model.symbols(shown=True):
-                    atom_name = atom.name
-                    
-                    if atom_name == "valid_modus_ponens":
-                        s1, s2, s3 = [str(arg).strip('"') for arg in atom.arguments]
-                        valid_inferences.append({
-                            "type": "modus_ponens",
-                            "description": f"Valid modus ponens: [{s1}, {s2}] → {s3}"
-                        })
-                    
-                    elif atom_name == "valid_modus_tollens":
-                        s1, s2, s3 = [str(arg).strip('"') for arg in atom.arguments]
-                        valid_inferences.append({
-                            "type": "modus_tollens",
-                            "description": f"Valid modus tollens: [{s1}, {s2}] → {s3}"
-                        })
-                    
-                    elif atom_name == "fallacy_affirming_consequent":
-                        s1, s2, s3 = [str(arg).strip('"') for arg in atom.arguments]
-                        issues.append({
-                            "type": "affirming_consequent",
-                            "description": f"Fallacy - Affirming the consequent: [{s1}, {s2}] → {s3}"
-                        })
-                    
-                    elif atom_name == "fallacy_denying_antecedent":
-                        s1, s2, s3 = [str(arg).strip('"') for arg in atom.arguments]
-                        issues.append({
-                            "type": "denying_antecedent",
-                            "description": f"Fallacy - Denying the antecedent: [{s1}, {s2}] → {s3}"
-                        })
-                    
-                    elif atom_name == "valid_universal_instantiation":
-                        s_forall, s_goal = [str(arg).strip('"') for arg in atom.arguments]
-                        # Find the instance premise among the cited from_ids for this goal
-                        inst = "?"
-                        for inf in argument.inferences:
-                            if inf.to_id == s_goal and s_forall in inf.from_ids:
-                                others = [x for x in inf.from_ids if x != s_forall]
-                                if others:
-                                    inst = others[0]
-                                break
-                        valid_inferences.append({
-                            "type": "universal_instantiation",
-                            "description": f"Valid universal instantiation: [{s_forall}, {inst}] → {s_goal}"
-                        })
-                    
-                    elif atom_name == "valid_syllogism":
-                        s1, s2, s3 = [str(arg).strip('"') for arg in atom.arguments]
-                        valid_inferences.append({
-                            "type": "syllogism",
-                            "description": f"Valid syllogism: [{s1}, {s2}] → {s3}"
-                        })
-                    
-                    elif atom_name == "fallacy_hasty_generalization":
-                        s1, s2 = [str(arg).strip('"') for arg in atom.arguments]
-                        issues.append({
-                            "type": "hasty_generalization",
-                            "description": f"Fallacy - Hasty generalization: {s1} → {s2}"
-                        })
-                    
-                    elif atom_name == "invalid_inference":
-                        to_id = str(atom.arguments[0]).strip('"')
-                        pattern = str(atom.arguments[1]).strip('"')
-                        issues.append({
-                            "type": "invalid_pattern",
-                            "description": f"Invalid inference pattern '{pattern}' for statement {to_id}"
-                        })
-                    
-                    elif atom_name == "valid_ui_mp":
-                        s_forall, s_inst, s_goal = [str(arg).strip('"') for arg in atom.arguments]
-                        valid_inferences.append({
-                            "type": "universal_instantiation",
-                            "description": f"Valid universal instantiation: [{s_forall}, {s_inst}] → {s_goal}"
-                        })
+                _collect_shown(shown, argument, issues, valid_inferences)
                 
                 # Only take first model
                 break
@@ -512,26 +574,50 @@ fallacy_hasty_generalization(Sinst, Sforall) :-
             "valid_inferences": valid_inferences
         }
     
-    def debug_argument(self, argument_text: str) -> Dict:
-        """Complete pipeline: extract and analyze logical form"""
+    def debug_argument(self, argument_text: str, argument: Optional[LogicalArgument] = None) -> Dict:
+        """Complete pipeline: extract and analyze logical form
+
+        If `argument` is given (e.g. prefetched by extract_all_async), the
+        extraction step is skipped.
+        """
         
-        print("Extracting logical form...")
-        argument = self.extract_logical_form(argument_text)
+        if argument is None:
+            if self.verbose:
+                print("Extracting logical form...")
+            argument = self.extract_logical_form(argument_text)
         argument = canonicalize_inference_patterns(argument)
 
-        print("\nLogical Structure:")
-        for stmt in argument.statements:
-            print(f"  {stmt.id}: {stmt.formula.to_string()}")
-        
-        print("\nInferences:")
-        for inf in argument.inferences:
-            print(f"  {inf.from_ids} → {inf.to_id} ({inf.pattern})")
-        
-        print("\nAnalyzing with ASP...")
+        if self.verbose:
+            sys.stdout.write(_format_structure(argument) + "\n\nAnalyzing with ASP...\n")
         result = self.analyze(argument)
     
         return result, argument
 
+def _format_statement(stmt: LogicalStatement) -> str:
+    return f"  {stmt.id}: {stmt.formula.to_string()}"
+
+def _format_structure(argument: LogicalArgument) -> str:
+    """Render the statements and inferences of an argument as printed by debug_argument."""
+    lines = ["\nLogical Structure:"]
+    lines.extend(_format_statement(stmt) for stmt in argument.statements)
+    lines.append("\nInferences:")
+    lines.extend(f"  {inf.from_ids} → {inf.to_id} ({inf.pattern})" for inf in argument.inferences)
+    return "\n".join(lines)
+
+async def extract_all_async(analyzer: LogicalAnalyzer, texts: List[str],
+                            concurrency: int = 8) -> List[Union[LogicalArgument, Exception]]:
+    """Extract logical forms for many arguments with at most `concurrency` LLM calls in flight.
+
+    Results are returned in input order; a failed extraction yields its exception.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(text: str):
+        async with sem:
+            return await analyzer.extract_logical_form_async(text)
+
+    return await asyncio.gather(*(one(t) for t in texts), return_exceptions=True)
+
 def fully_verify_with_lean(argument: LogicalArgument) -> Dict:
     try:
         ran_any_check = False
@@ -557,6 +643,8 @@ def fully_verify_with_lean(argument: LogicalArgument) -> Dict:
                     print("    note:", res.message.splitlines()[0])
         # else: stay silent (no “Not verified” noise when there is nothing to check)
 
+        by_id = _statements_by_id(argument)
+
         # (B) Universal Instantiation checks (first‑order)
         ui_checks = 0
         for inf in argument.inferences:
@@ -565,11 +653,10 @@ def fully_verify_with_lean(argument: LogicalArgument) -> Dict:
             ui_checks += 1
             ran_any_check = True
 
-            s_forall = next((s for s in argument.statements
-                                if s.id in inf.from_ids and s.formula.type == "forall"), None)
-            s_other  = next((s for s in argument.statements
-                                if s.id in inf.from_ids and s is not s_forall), None)
-            s_goal   = next((s for s in argument.statements if s.id == inf.to_id), None)
+            prem = _premises_of(argument, inf)
+            s_forall = next((s for s in prem if s.formula.type == "forall"), None)
+            s_other  = next((s for s in prem if s is not s_forall), None)
+            s_goal   = by_id.get(inf.to_id)
 
             ok = False; artifact = None; note = ""
             if s_forall and s_other and s_goal:
@@ -608,9 +695,10 @@ def fully_verify_with_lean(argument: LogicalArgument) -> Dict:
         for inf in argument.inferences:
             if inf.pattern != "modus_tollens":
                 continue
-            s_imp = next((s for s in argument.statements if s.id in inf.from_ids and s.formula.type == "implies"), None)
-            s_negQ = next((s for s in argument.statements if s.id in inf.from_ids and s is not s_imp), None)
-            s_goal = next((s for s in argument.statements if s.id == inf.to_id), None)
+            prem = _premises_of(argument, inf)
+            s_imp = next((s for s in prem if s.formula.type == "implies"), None)
+            s_negQ = next((s for s in prem if s is not s_imp), None)
+            s_goal = by_id.get(inf.to_id)
 
             ok = False; artifact = None; note = ""
             if s_imp and s_negQ and s_goal:
@@ -634,9 +722,12 @@ def fully_verify_with_lean(argument: LogicalArgument) -> Dict:
         for inf in argument.inferences:
             if inf.pattern != "hypothetical_syllogism":
                 continue
-            s1 = next((s for s in argument.statements if s.id in inf.from_ids and s.formula.type == "forall"), None)
-            s2 = next((s for s in argument.statements if s.id in inf.from_ids and s.formula.type == "forall" and s is not s1), None)
-            s3 = next((s for s in argument.statements if s.id == inf.to_id and s.formula.type == "forall"), None)
+            prem = _premises_of(argument, inf)
+            s1 = next((s for s in prem if s.formula.type == "forall"), None)
+            s2 = next((s for s in prem if s.formula.type == "forall" and s is not s1), None)
+            s3 = by_id.get(inf.to_id)
+            if s3 is not None and s3.formula.type != "forall":
+                s3 = None
 
             ok = False; artifact = None; note = ""
             if s1 and s2 and s3:
@@ -670,15 +761,27 @@ def fully_verify_with_lean(argument: LogicalArgument) -> Dict:
     except Exception as e:
         print(f"\nLean micro‑verification error: {e}")
 
+def _statements_by_id(argument: LogicalArgument) -> Dict[str, LogicalStatement]:
+    """First statement per id, built once per argument instead of a scan per lookup."""
+    by_id: Dict[str, LogicalStatement] = {}
+    for s in argument.statements:
+        by_id.setdefault(s.id, s)
+    return by_id
+
+def _premises_of(argument: LogicalArgument, inf: LogicalInference) -> List[LogicalStatement]:
+    """Statements cited by `inf`, in statement order (one pass for all premise lookups)."""
+    from_ids = set(inf.from_ids)
+    return [s for s in argument.statements if s.id in from_ids]
+
 def canonicalize_inference_patterns(argument: LogicalArgument) -> LogicalArgument:
     """Re-label common shapes into the most specific canonical pattern."""
+    by_id = _statements_by_id(argument)
     for inf in argument.inferences:
         # Look for the UI+MP shape: ∀x(P→Q), P(c) ⊢ Q(c)
-        s_forall = next((s for s in argument.statements
-                         if s.id in inf.from_ids and s.formula.type == "forall"), None)
-        s_other  = next((s for s in argument.statements
-                         if s.id in inf.from_ids and (s_forall is None or s.id != s_forall.id)), None)
-        s_goal   = next((s for s in argument.statements if s.id == inf.to_id), None)
+        prem = _premises_of(argument, inf)
+        s_forall = next((s for s in prem if s.formula.type == "forall"), None)
+        s_other  = next((s for s in prem if s_forall is None or s.id != s_forall.id), None)
+        s_goal   = by_id.get(inf.to_id)
 
         if s_forall and s_other and s_goal \
            and s_other.formula.type == "atom" \
@@ -702,9 +805,12 @@ def canonicalize_inference_patterns(argument: LogicalArgument) -> LogicalArgumen
 # =============================================================================
 
 _DEFAULT_VAR_TOKENS = {"x", "y", "z", "u", "v", "w"}
+# Both cases, so terms are tested without allocating a lowercased copy
+_DEFAULT_VAR_TOKENS_ANYCASE = frozenset(_DEFAULT_VAR_TOKENS | {v.upper() for v in _DEFAULT_VAR_TOKENS})
+_NON_TPTP_RE = re.compile(r"[^A-Za-z0-9_]")
 
 def _tptp_sym(s: str, *, is_var: bool = False) -> str:
-    s = re.sub(r"[^A-Za-z0-9_]", "_", s.strip() or ("X" if is_var else "c"))
+    s = _NON_TPTP_RE.sub("_", s.strip() or ("X" if is_var else "c"))
     if is_var:
         return (s[0].upper() + s[1:]) if not s[0].isupper() else s
     return (s[0].lower() + s[1:]) if not s[0].islower() else s
@@ -715,13 +821,13 @@ def _collect_free_vars(f: FOLFormula, bound: set[str] | None = None) -> set[str]
     if t == "atom" and f.atom:
         vs = set()
         for term in f.atom.terms:
-            if term not in bound and term.lower() in _DEFAULT_VAR_TOKENS:
+            if term not in bound and term in _DEFAULT_VAR_TOKENS_ANYCASE:
                 vs.add(term)
         return vs
     if t == "not" and f.left: return _collect_free_vars(f.left, bound)
-    if t in {"and","or","implies","iff"} and f.left and f.right:
+    if t in _BINARY_TYPES and f.left and f.right:
         return _collect_free_vars(f.left, bound) | _collect_free_vars(f.right, bound)
-    if t in {"forall","exists"} and f.variable and f.body:
+    if t in _QUANTIFIER_TYPES and f.variable and f.body:
         return _collect_free_vars(f.body, bound | {f.variable})
     return set()
 
@@ -735,17 +841,17 @@ def _fol_to_fof(f: FOLFormula, varmap: dict[str,str] | None = None) -> str:
         for term in f.atom.terms:
             if term in varmap:
                 args.append(varmap[term])
-            elif term.lower() in _DEFAULT_VAR_TOKENS:
+            elif term in _DEFAULT_VAR_TOKENS_ANYCASE:
                 args.append(_tptp_sym(term, is_var=True))
             else:
                 args.append(_tptp_sym(term))
         return f"{p}({','.join(args)})"
     if t == "not" and f.left:
         return f"~({_fol_to_fof(f.left, varmap)})"
-    if t in {"and","or","implies","iff"} and f.left and f.right:
+    if t in _BINARY_TYPES and f.left and f.right:
         op = {"and":"&", "or":"|", "implies":"=>", "iff":"<=>"}[t]
         return f"({_fol_to_fof(f.left,varmap)} {op} {_fol_to_fof(f.right,varmap)})"
-    if t in {"forall","exists"} and f.variable and f.body:
+    if t in _QUANTIFIER_TYPES and f.variable and f.body:
         v = _tptp_sym(f.variable, is_var=True)
         inner = dict(varmap); inner[f.variable] = v
         q = "![" if t=="forall" else "?["
@@ -762,7 +868,7 @@ def formula_to_fof_closed(f: FOLFormula) -> str:
     return _close_universally(_fol_to_fof(f, {}), free)
 
 def _sanitize_name(n: str) -> str:
-    n = re.sub(r"[^A-Za-z0-9_]", "_", n.strip() or "s")
+    n = _NON_TPTP_RE.sub("_", n.strip() or "s")
     if not n[0].isalpha(): n = "s_" + n
     if not n[0].islower(): n = n[0].lower() + n[1:]
     return n
@@ -802,6 +908,10 @@ def main():
     parser.add_argument('--lean', action='store_true', help='Verify with Lean')
     parser.add_argument('--debug', action='store_true', help='Show ASP program and debug output')
     parser.add_argument('--example', type=int, help='Run a specific example (1-based index)')
+    parser.add_argument('--parallel', action='store_true', help='Use multi-threaded clingo solving')
+    parser.add_argument('--threads', type=int, help='Solver threads for --parallel (default: CPU count)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                       help='Max concurrent LLM extractions when running several examples (default: 8)')
     args = parser.parse_args()
     
     # Read examples from file
@@ -822,7 +932,7 @@ def main():
         print(f"Error reading file: {e}")
         return
     
-    analyzer = LogicalAnalyzer(debug=args.debug)
+    analyzer = LogicalAnalyzer(debug=args.debug, parallel=args.parallel, threads=args.threads)
     
     # Select specific example or run all
     if args.example:
@@ -832,13 +942,25 @@ def main():
             print(f"Error: Example {args.example} out of range (1-{len(examples)})")
             return
     else:
-        examples_to_run = enumerate(examples, 1)
+        examples_to_run = list(enumerate(examples, 1))
+
+    # Issue the (network-bound) LLM extractions concurrently up front;
+    # ASP analysis and reporting then proceed in example order.
+    prefetched = {}
+    if len(examples_to_run) > 1 and args.concurrency > 1:
+        print(f"Extracting logical forms ({args.concurrency} concurrent requests)...")
+        extracted = asyncio.run(extract_all_async(
+            analyzer, [t for _, t in examples_to_run], concurrency=args.concurrency))
+        prefetched = {i: lf for (i, _), lf in zip(examples_to_run, extracted)}
     
     for i, arg_text in examples_to_run:
         print(f"\n# EXAMPLE {i}\n{arg_text}\n")
         
         try:
-            result, argument = analyzer.debug_argument(arg_text)
+            argument = prefetched.get(i)
+            if isinstance(argument, Exception):
+                raise argument
+            result, argument = analyzer.debug_argument(arg_text, argument=argument)
             
             if result['issues']:
                 print("\n❌ LOGICAL ISSUES FOUND:")
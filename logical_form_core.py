@@ -15,23 +15,37 @@ def _key(formula: Any) -> str:
         return repr(formula)
 
 def lf_to_core(argument: Any) -> LFCore:
+    # Stringifying a formula walks the whole tree; memoize per formula object
+    key_cache: Dict[int, str] = {}
+    def k(f: Any) -> str:
+        fid = id(f)
+        if fid not in key_cache:
+            key_cache[fid] = _key(f)
+        return key_cache[fid]
+
     id_to_formula: Dict[str, Any] = {str(s.id): s.formula for s in argument.statements}
     key_to_ids: Dict[str, List[str]] = {}
     for sid, f in id_to_formula.items():
-        key_to_ids.setdefault(_key(f), []).append(sid)
+        key_to_ids.setdefault(k(f), []).append(sid)
 
     atoms: List[str] = list(id_to_formula.keys())
 
-    # Explicit top-level (A → B) statements only
+    # Explicit top-level (A → B) statements only; dedup and track
+    # sources/targets in the same pass
     edges: List[Tuple[str, str]] = []
+    seen_edges: Set[Tuple[str, str]] = set()
+    outs: Set[str] = set(); ins: Set[str] = set()
     for sid, f in id_to_formula.items():
         if getattr(f, "type", None) == "implies" and f.left and f.right:
-            lk = _key(f.left); rk = _key(f.right)
+            lk = k(f.left); rk = k(f.right)
             l_ids = key_to_ids.get(lk) or []
             r_ids = key_to_ids.get(rk) or []
             if l_ids and r_ids:
-                edges.append((l_ids[0], r_ids[0]))
-    edges = list(dict.fromkeys(edges))
+                edge = (l_ids[0], r_ids[0])
+                if edge not in seen_edges:
+                    seen_edges.add(edge)
+                    edges.append(edge)
+                    outs.add(edge[0]); ins.add(edge[1])
 
     # Facts: classic heuristic—anything never concluded
     conclusions = {str(inf.to_id) for inf in getattr(argument, "inferences", []) or []}
@@ -41,7 +55,6 @@ def lf_to_core(argument: Any) -> LFCore:
     if getattr(argument, "goal_id", None):
         goals = [str(argument.goal_id)]
     else:
-        outs = {a for (a, _) in edges}; ins = {b for (_, b) in edges}
         sinks = sorted(ins - outs)
         goals = [sinks[0]] if sinks else []
 
@@ -27,14 +27,20 @@ Environment for LLM (same as ad.py):
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
+import hashlib
 import json
 import re
-from typing import Dict, List, Set, Tuple, Optional
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterator, List, Set, TextIO, Tuple, Optional
 
 # ---------------------------
 # LLM client and Pydantic imports
 # ---------------------------
-from llm import init_llm_client, generate_content
+from llm import get_shared_llm_client, generate_content, generate_content_async, llm_config_digest, LLM_MODEL
 
 _HAVE_PYDANTIC = False
 try:
@@ -53,38 +59,65 @@ try:
 except ImportError:
     types = None
 
+# Optional faster JSON decoding for LLM responses
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Optional: NumPy for the pairwise heuristic on larger inputs
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # ---------------------------
 # Parsing utilities
 # ---------------------------
 
-STOPWORDS = {
+STOPWORDS = frozenset({
     "the","a","an","and","or","to","of","in","on","for","with","by","as",
     "that","this","it","is","are","was","were","be","being","been",
     "at","from","but","if","then","than","so","because","since","while",
     "we","you","they","he","she","i","me","my","our","your","their",
     "do","does","did","done","have","has","had","will","would","can","could","may","might","must","should",
     "not"
-}
+})
 NEG_MARKERS = {"not","no","never","cannot","can't","cant","n't"}
 TOKEN_RE = re.compile(r"[a-z]+")
+WS_RE = re.compile(r"\s+")
+BLANK_LINES_RE = re.compile(r"(?:\n\s*\n)+")
+ID_RE = re.compile(r"(?im)^\s*id\s*:\s*([A-Za-z0-9_\-#]+)\s*$")
+ATTACKS_RE = re.compile(r"(?im)^\s*attacks\s*:\s*(.+?)\s*$")
+ATTACK_SEP_RE = re.compile(r"[\s,;]+")
+DIRECTIVE_RE = re.compile(r"(?im)^\s*(id|attacks)\s*:")
+NON_ATOM_RE = re.compile(r"[^A-Za-z0-9_]")
+# Any negation marker as a whole word, or an "n't" contraction anywhere
+NEG_RE = re.compile(r"n't|\b(?:" + "|".join(re.escape(m) for m in sorted(NEG_MARKERS, key=len, reverse=True)) + r")\b")
 
 def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text.strip()).strip()
+    return WS_RE.sub(" ", text.strip()).strip()
 
 def tokens(text: str) -> List[str]:
     return TOKEN_RE.findall(text.lower())
 
-def content_tokens(text: str) -> Set[str]:
-    return {w for w in tokens(text) if w not in STOPWORDS}
+# Memoized on the block text: repeated builds (e.g. threshold sweeps) and
+# duplicate blocks reuse the tokenization. Lowercases the block once for both
+# features; the token set is a frozenset so the cached value cannot be mutated.
+@functools.lru_cache(maxsize=4096)
+def block_features(text: str) -> Tuple[FrozenSet[str], bool]:
+    """(content tokens, has negation) for one block."""
+    low = text.lower()
+    # Set difference runs in C and filters each distinct token once
+    ctoks = frozenset(TOKEN_RE.findall(low)).difference(STOPWORDS)
+    return ctoks, NEG_RE.search(low) is not None
+
+def content_tokens(text: str) -> FrozenSet[str]:
+    return block_features(text)[0]
 
 def has_negation(text: str) -> bool:
-    low = text.lower()
-    if "n't" in low:
-        return True
-    for m in NEG_MARKERS:
-        if re.search(rf"\b{re.escape(m)}\b", low):
-            return True
-    return False
+    return block_features(text)[1]
 
 def jaccard(a: Set[str], b: Set[str]) -> float:
     if not a and not b:
@@ -94,45 +127,96 @@ def jaccard(a: Set[str], b: Set[str]) -> float:
     return 0.0 if union == 0 else inter / union
 
 def parse_blocks(path: str) -> List[str]:
+    return list(parse_blocks_file(path))
+
+def parse_blocks_file(path: str) -> Iterator[str]:
+    """Lazily yield the blocks of a file, reading it line by line.
+    Splits exactly like parse_blocks_text: on whitespace-only lines."""
     with open(path, "r", encoding="utf-8") as f:
-        raw = f.read()
-    return parse_blocks_text(raw)
+        buf: List[str] = []
+        for line in f:
+            if not line.isspace():
+                buf.append(line)
+                continue
+            if buf:
+                block = "".join(buf).strip()
+                buf = []
+                if block:
+                    yield block
+        if buf:
+            block = "".join(buf).strip()
+            if block:
+                yield block
 
 def parse_blocks_text(raw: str) -> List[str]:
     # Normalize line endings and split on blank lines (incl. spaces)
     raw = raw.replace("\r\n", "\n").replace("\r", "\n").strip()
-    blocks = re.split(r"(?:\n\s*\n)+", raw)
+    # Fast path: literal "\n\n" separators; fall back to the regex only if a
+    # block still contains a whitespace-only line
+    blocks = [b.strip() for b in raw.split("\n\n")]
+    if any("\n" in b and BLANK_LINES_RE.search(b) for b in blocks):
+        blocks = [b.strip() for b in BLANK_LINES_RE.split(raw)]
     # Trim each block but KEEP internal newlines so ^ATTACKS: still matches
-    return [b.strip() for b in blocks if b.strip()]
+    return [b for b in blocks if b]
 
 
 def parse_id_from_block(block: str) -> Optional[str]:
-    m = re.search(r"(?im)^\s*id\s*:\s*([A-Za-z0-9_\-#]+)\s*$", block)
+    m = ID_RE.search(block)
     return m.group(1).strip() if m else None
 
 def parse_attacks_from_block(block: str) -> List[str]:
     toks = []
     for line in block.splitlines():
-        m = re.match(r"(?im)^\s*attacks\s*:\s*(.+?)\s*$", line)
+        m = ATTACKS_RE.match(line)
         if m:
             tail = m.group(1)
-            toks += [p.strip() for p in re.split(r"[\s,;]+", tail) if p.strip()]
+            toks += [p.strip() for p in ATTACK_SEP_RE.split(tail) if p.strip()]
     return toks
 
 def strip_directives(block: str) -> str:
     lines = []
     for line in block.splitlines():
-        if re.match(r"(?im)^\s*(id|attacks)\s*:", line):
+        if DIRECTIVE_RE.match(line):
             continue
         lines.append(line)
     return normalize("\n".join(lines))
 
+def parse_block_full(block: str) -> Tuple[Optional[str], List[str], str]:
+    """One pass over a block's lines: (ID directive, ATTACKS tokens, text
+    without directives). Equivalent to parse_id_from_block,
+    parse_attacks_from_block and strip_directives, for IDs given on the
+    directive line itself."""
+    blk_id: Optional[str] = None
+    attacks: List[str] = []
+    kept: List[str] = []
+    for line in block.splitlines():
+        d = DIRECTIVE_RE.match(line)
+        if d is None:
+            kept.append(line)
+        elif d.group(1).lower() == "id":
+            if blk_id is None:
+                m = ID_RE.match(line)
+                if m:
+                    blk_id = sys.intern(m.group(1).strip())
+        else:
+            m = ATTACKS_RE.match(line)
+            if m:
+                attacks += [sys.intern(p.strip()) for p in ATTACK_SEP_RE.split(m.group(1)) if p.strip()]
+    return blk_id, attacks, normalize("\n".join(kept))
+
 def assign_ids(n: int) -> List[str]:
     return [f"A{i+1}" for i in range(n)]
 
+# ASCII fast path for sanitize_atom: one C-level translate instead of a regex
+_ATOM_TABLE = str.maketrans({c: "_" for c in map(chr, range(128))
+                             if not (c.isascii() and (c.isalnum() or c == "_"))})
+
 def sanitize_atom(s: str) -> str:
     """APX atoms should be safe identifiers; make lowercase, alnum/_; start with letter."""
-    s2 = re.sub(r"[^A-Za-z0-9_]", "_", s).lower()
+    if s.isascii():
+        s2 = s.translate(_ATOM_TABLE).lower()
+    else:
+        s2 = NON_ATOM_RE.sub("_", s).lower()
     if not s2 or not s2[0].isalpha():
         s2 = "a" + s2
     return s2
@@ -163,14 +247,67 @@ if _HAVE_PYDANTIC:
     class AFEdges(BaseModel):
         edges: List[EdgeModel] = Field(default_factory=list)
 
+def loads_json_object(text: str) -> dict:
+    """Parse a JSON object from LLM output. Well-formed output parses
+    directly; otherwise try the outermost {...} span (e.g. text wrapped in
+    a code fence) before giving up. No per-brace candidate scan."""
+    try:
+        return _json_loads(text)
+    except ValueError:
+        start = text.find("{"); end = text.rfind("}")
+        if start == -1 or end <= start:
+            raise
+        return _json_loads(text[start:end + 1])
+
+# In-process cache of raw LLM edge responses, keyed by a hash of model + prompt
+# + resolved LLM configuration (so one API key's responses never serve another).
+# The confidence threshold is applied after parsing, so threshold sweeps hit it.
+# (llm.generate_content adds an on-disk cache on top when CACHE_LLM is set.)
+# Guarded by a lock: server requests build AFs from several threads at once.
+_LLM_EDGES_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_LLM_EDGES_CACHE_SIZE = 256
+_LLM_EDGES_CACHE_LOCK = threading.Lock()
+
+def _cached_llm_text(key: str) -> Optional[str]:
+    with _LLM_EDGES_CACHE_LOCK:
+        text = _LLM_EDGES_CACHE.get(key)
+        if text is not None:
+            _LLM_EDGES_CACHE.move_to_end(key)
+        return text
+
+def _cache_llm_text(key: str, text: str) -> None:
+    with _LLM_EDGES_CACHE_LOCK:
+        _LLM_EDGES_CACHE[key] = text
+        if len(_LLM_EDGES_CACHE) > _LLM_EDGES_CACHE_SIZE:
+            _LLM_EDGES_CACHE.popitem(last=False)
+
+def _llm_cache_key(prompt: str) -> str:
+    schema = "AFEdges" if _HAVE_PYDANTIC else "json"
+    return hashlib.sha256(f"{LLM_MODEL}\x00{schema}\x00{llm_config_digest()}\x00{prompt}".encode("utf-8")).hexdigest()
+
 class LLMAttackExtractor:
-    def __init__(self, threshold: float = 0.55):
+    def __init__(self, threshold: float = 0.55, window: Optional[int] = None):
         self.threshold = threshold
-        self.client = init_llm_client()
-
-    def infer_edges(self, blocks: List[str]) -> Set[Tuple[int, int]]:
-        listing = "\n".join([f"#{i+1}: {blocks[i]}" for i in range(len(blocks))])
-        prompt = f"""
+        # If set, lists longer than `window` items are split into overlapping
+        # windows queried concurrently (attacks between items that never share
+        # a window are not seen)
+        self.window = window
+        self._client = None
+        # Messages of LLM calls that failed during the last inference; their
+        # edges are missing from the result
+        self.errors: List[str] = []
+
+    @property
+    def client(self):
+        # Resolved per inference (not for empty input); raises on missing or
+        # invalid configuration, unlike failures of the calls themselves
+        if self._client is None:
+            self._client = get_shared_llm_client()
+        return self._client
+
+    @staticmethod
+    def _prompt(listing: str) -> str:
+        return f"""
 You are extracting a Dung Abstract Argumentation Framework (AF) from a list of short argument items.
 
 TASK:
@@ -182,71 +319,228 @@ TASK:
 ITEMS:
 {listing}
 """
+
+    @staticmethod
+    def _config():
+        if _HAVE_PYDANTIC:
+            return types.GenerateContentConfig(
+                temperature=0.1,
+                thinking_config=types.ThinkingConfig(thinking_budget=0),
+                response_mime_type="application/json",
+                response_schema=AFEdges
+            )
+        return types.GenerateContentConfig(
+            temperature=0.1,
+            thinking_config=types.ThinkingConfig(thinking_budget=0),
+            response_mime_type="application/json"
+        )
+
+    @staticmethod
+    def _parse_edges(text: str) -> Dict[Tuple[int,int], float]:
+        """(i, j) -> confidence, with 0-based indices into the prompted list."""
+        if _HAVE_PYDANTIC:
+            data = AFEdges.model_validate_json(text)
+            raw = [dict(src=e.src, dst=e.dst, confidence=e.confidence) for e in data.edges]
+        else:
+            data = loads_json_object(text)
+            raw = data.get("edges", [])
+        edges: Dict[Tuple[int,int], float] = {}
+        for e in raw:
+            try:
+                i = int(str(e["src"]).lstrip("#")) - 1
+                j = int(str(e["dst"]).lstrip("#")) - 1
+                conf = float(e.get("confidence", 1.0))
+            except Exception:
+                continue
+            edges[(i, j)] = max(conf, edges.get((i, j), conf))
+        return edges
+
+    def _thresholded(self, scored: Dict[Tuple[int,int], float]) -> Set[Tuple[int,int]]:
+        return {e for e, conf in scored.items() if conf >= self.threshold}
+
+    def infer_edges(self, blocks: List[str]) -> Set[Tuple[int, int]]:
+        self.errors = []
+        if not blocks:
+            return set()
+        if self.window and len(blocks) > self.window:
+            return asyncio.run(self.infer_edges_async(blocks))
+        client = self.client
+        listing = "\n".join([f"#{i+1}: {blocks[i]}" for i in range(len(blocks))])
+        prompt = self._prompt(listing)
         try:
-            if _HAVE_PYDANTIC:
-                cfg = types.GenerateContentConfig(
-                    temperature=0.1,
-                    thinking_config=types.ThinkingConfig(thinking_budget=0),
-                    response_mime_type="application/json",
-                    response_schema=AFEdges
-                )
-            else:
-                cfg = types.GenerateContentConfig(
-                    temperature=0.1,
-                    thinking_config=types.ThinkingConfig(thinking_budget=0),
-                    response_mime_type="application/json"
+            key = _llm_cache_key(prompt)
+            text = _cached_llm_text(key)
+            if text is None:
+                resp = generate_content(
+                    client,
+                    contents=prompt,
+                    config=self._config()
                 )
-            resp = generate_content(
-                self.client,
-                contents=prompt,
-                config=cfg
-            )
-            text = resp.text
-            if _HAVE_PYDANTIC:
-                data = AFEdges.model_validate_json(text)
-                raw = [dict(src=e.src, dst=e.dst, confidence=e.confidence) for e in data.edges]
-            else:
-                data = json.loads(text)
-                raw = data.get("edges", [])
-            edges: Set[Tuple[int,int]] = set()
-            for e in raw:
-                try:
-                    i = int(str(e["src"]).lstrip("#")) - 1
-                    j = int(str(e["dst"]).lstrip("#")) - 1
-                    conf = float(e.get("confidence", 1.0))
-                except Exception:
-                    continue
-                if conf >= self.threshold:
-                    edges.add((i, j))
-            return edges
+                text = resp.text
+                _cache_llm_text(key, text)
+            return self._thresholded(self._parse_edges(text))
         except Exception as e:
             print(f"% [WARN] LLM inference failed: {e}")
+            self.errors.append(str(e))
+            return set()
+
+    async def infer_edges_async(self, blocks: List[str], concurrency: int = 8) -> Set[Tuple[int, int]]:
+        """Query overlapping windows of `self.window` items concurrently and
+        merge their edges (max confidence per edge) in global indices."""
+        self.errors = []
+        n = len(blocks)
+        size = self.window or n
+        if size <= 0 or n == 0:
             return set()
+        stride = max(1, size - min(5, size // 4))
+        starts = list(range(0, max(n - size, 0) + 1, stride))
+        if starts[-1] + size < n:
+            starts.append(n - size)
+        client = self.client
+        cfg = self._config()
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(start: int) -> Dict[Tuple[int,int], float]:
+            idx = list(range(start, min(start + size, n)))
+            listing = "\n".join(f"#{k+1}: {blocks[g]}" for k, g in enumerate(idx))
+            prompt = self._prompt(listing)
+            try:
+                key = _llm_cache_key(prompt)
+                text = _cached_llm_text(key)
+                if text is None:
+                    async with sem:
+                        resp = await generate_content_async(client, contents=prompt, config=cfg)
+                    text = resp.text
+                    _cache_llm_text(key, text)
+                local = self._parse_edges(text)
+            except Exception as e:
+                print(f"% [WARN] LLM inference failed for items #{start+1}-#{idx[-1]+1}: {e}")
+                self.errors.append(f"items #{start+1}-#{idx[-1]+1}: {e}")
+                return {}
+            return {(idx[i], idx[j]): c for (i, j), c in local.items()
+                    if 0 <= i < len(idx) and 0 <= j < len(idx)}
+
+        merged: Dict[Tuple[int,int], float] = {}
+        for part in await asyncio.gather(*(one(st) for st in starts)):
+            for e, c in part.items():
+                merged[e] = max(c, merged.get(e, c))
+        return self._thresholded(merged)
 
 # ---------------------------
 # AF construction (explicit / heuristic / LLM)
 # ---------------------------
 
+# Below this many blocks, plain set ops beat building the indicator matrix
+_NUMPY_MIN_BLOCKS = 32
+# The NumPy path is dense: an N x V indicator matrix plus three N_neg x N_pos
+# float64 arrays. Above this many cells (N*V + N*N, ~16 MB per array) the
+# sparse inverted index is used instead, so memory stays bounded.
+_NUMPY_MAX_CELLS = 2_000_000
+
+def heuristic_pairs(ctoks: List[FrozenSet[str]],
+                    negf: List[bool],
+                    min_overlap: int,
+                    jac_threshold: float) -> Set[Tuple[int,int]]:
+    """Symmetric attack edges between blocks that share enough content tokens
+    (overlap and Jaccard thresholds) and differ in negation."""
+    n = len(ctoks)
+    if np is not None and n >= _NUMPY_MIN_BLOCKS:
+        vocab_size = len(frozenset().union(*ctoks))
+        if n * (vocab_size + n) <= _NUMPY_MAX_CELLS:
+            return _heuristic_pairs_numpy(ctoks, negf, min_overlap, jac_threshold)
+    sizes = [len(t) for t in ctoks]
+    # Only pairs that differ in negation can produce an edge, so pair
+    # negated with non-negated blocks; blocks with fewer than min_overlap
+    # tokens cannot reach the overlap threshold at all
+    neg_idx = [i for i in range(n) if negf[i] and sizes[i] >= min_overlap]
+    pos_idx = [j for j in range(n) if not negf[j] and sizes[j] >= min_overlap]
+    edges: Set[Tuple[int,int]] = set()
+    if min_overlap <= 0 and jac_threshold <= 0:
+        # Degenerate thresholds: every cross pair qualifies, shared tokens or not
+        for i in neg_idx:
+            for j in pos_idx:
+                edges.add((i, j))
+                edges.add((j, i))
+        return edges
+    # Otherwise a qualifying pair shares at least one token. Count shared
+    # tokens through an inverted index (token -> non-negated blocks), so
+    # pairs with nothing in common are never visited.
+    postings: Dict[str, List[int]] = {}
+    for j in pos_idx:
+        for t in ctoks[j]:
+            postings.setdefault(t, []).append(j)
+    for i in neg_idx:
+        si = sizes[i]
+        shared: Dict[int, int] = {}
+        for t in ctoks[i]:
+            for j in postings.get(t, ()):
+                shared[j] = shared.get(j, 0) + 1
+        for j, inter in shared.items():
+            if inter < min_overlap:
+                continue
+            union = si + sizes[j] - inter
+            if (0.0 if union == 0 else inter / union) < jac_threshold:
+                continue
+            edges.add((i, j))
+            edges.add((j, i))
+    return edges
+
+def _heuristic_pairs_numpy(ctoks: List[FrozenSet[str]],
+                           negf: List[bool],
+                           min_overlap: int,
+                           jac_threshold: float) -> Set[Tuple[int,int]]:
+    """heuristic_pairs via a block × token indicator matrix X: the pairwise
+    intersections come from one matrix product, and the thresholds are
+    applied as masks. Counts are exact in float64, so the Jaccard ratios match the
+    pure-Python path bit for bit."""
+    vocab: Dict[str, int] = {}
+    rows: List[int] = []; cols: List[int] = []
+    for i, toks in enumerate(ctoks):
+        for t in toks:
+            rows.append(i)
+            cols.append(vocab.setdefault(t, len(vocab)))
+    X = np.zeros((len(ctoks), len(vocab)), dtype=np.float64)
+    X[rows, cols] = 1.0
+    # Only negated × non-negated pairs can produce an edge
+    neg = np.asarray(negf, dtype=bool)
+    neg_idx = np.flatnonzero(neg); pos_idx = np.flatnonzero(~neg)
+    Xn = X[neg_idx]; Xp = X[pos_idx]
+    inter = Xn @ Xp.T
+    sizes = np.fromiter((len(t) for t in ctoks), dtype=np.float64, count=len(ctoks))
+    union = sizes[neg_idx][:, None] + sizes[pos_idx][None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jac = np.where(union > 0, inter / union, 0.0)
+    mask = (inter >= min_overlap) & (jac >= jac_threshold)
+    edges: Set[Tuple[int,int]] = set()
+    for a, b in np.argwhere(mask):
+        i = int(neg_idx[a]); j = int(pos_idx[b])
+        edges.add((i, j))
+        edges.add((j, i))
+    return edges
+
 def build_edges(blocks: List[str],
                 relation_mode: str = "auto",
                 jac_threshold: float = 0.45,
                 min_overlap: int = 3,
                 use_llm: bool = False,
                 llm_threshold: float = 0.55,
-                llm_mode: str = "augment") -> Tuple[List[str], Dict[str,str], Set[Tuple[int,int]], Dict]:
+                llm_mode: str = "augment",
+                llm_window: Optional[int] = None) -> Tuple[List[str], Dict[str,str], Set[Tuple[int,int]], Dict]:
     """Returns (ids, id_to_text, edges(indexed), meta)."""
     # IDs (prefer explicit; else A1..An)
-    provided_ids = [parse_id_from_block(b) for b in blocks]
+    parsed = [parse_block_full(b) for b in blocks]
+    provided_ids = [pid for pid, _, _ in parsed]
     auto_ids = assign_ids(len(blocks)) if any(pid is None for pid in provided_ids) else []
-    ids = [pid if pid is not None else auto_ids[i] for i, pid in enumerate(provided_ids)]
-    # Strip directives for text
-    id_to_text = {ids[i]: strip_directives(blocks[i]) for i in range(len(blocks))}
+    # Interned, so ATTACKS lookups against index_of compare by identity
+    ids = [pid if pid is not None else sys.intern(auto_ids[i]) for i, pid in enumerate(provided_ids)]
+    # Text with directives stripped
+    id_to_text = {ids[i]: parsed[i][2] for i in range(len(blocks))}
 
     # Explicit edges (index-based)
     explicit_edges: Set[Tuple[int,int]] = set()
     index_of = {ids[i]: i for i in range(len(ids))}
-    for i, b in enumerate(blocks):
-        for t in parse_attacks_from_block(b):
+    for i, (_, attack_toks, _) in enumerate(parsed):
+        for t in attack_toks:
             dst = None
             if t.startswith("#"):
                 try:
@@ -269,24 +563,18 @@ def build_edges(blocks: List[str],
     if relation_mode == "none":
         use_heur = False
     if use_heur:
-        ctoks = {i: content_tokens(id_to_text[ids[i]]) for i in range(len(ids))}
-        negf = {i: has_negation(id_to_text[ids[i]]) for i in range(len(ids))}
-        for i in range(len(ids)):
-            for j in range(i+1, len(ids)):
-                A = ctoks[i]; B = ctoks[j]
-                if len(A & B) < min_overlap: 
-                    continue
-                if jaccard(A, B) < jac_threshold:
-                    continue
-                if negf[i] ^ negf[j]:
-                    heuristic_edges.add((i, j))
-                    heuristic_edges.add((j, i))
+        feats = [block_features(id_to_text[id_]) for id_ in ids]
+        ctoks = [f[0] for f in feats]
+        negf = [f[1] for f in feats]
+        heuristic_edges = heuristic_pairs(ctoks, negf, min_overlap, jac_threshold)
 
     # LLM edges
     llm_edges: Set[Tuple[int,int]] = set()
+    llm_errors: List[str] = []
     if use_llm:
-        ext = LLMAttackExtractor(threshold=llm_threshold)
+        ext = LLMAttackExtractor(threshold=llm_threshold, window=llm_window)
         llm_edges = ext.infer_edges(blocks)
+        llm_errors = ext.errors
 
     # Combine
     if use_llm and llm_mode == "override":
@@ -295,10 +583,11 @@ def build_edges(blocks: List[str],
         edges = set(explicit_edges) | set(heuristic_edges) | set(llm_edges)
 
     meta = {
-        "explicit_edges": sorted(list(explicit_edges)),
-        "heuristic_edges": sorted(list(heuristic_edges)),
-        "llm_edges": sorted(list(llm_edges)),
-        "final_edges": sorted(list(edges)),
+        "explicit_edges": sorted(explicit_edges),
+        "heuristic_edges": sorted(heuristic_edges),
+        "llm_edges": sorted(llm_edges),
+        "final_edges": sorted(edges),
+        "llm_errors": llm_errors,
     }
     return ids, id_to_text, edges, meta
 
@@ -306,39 +595,48 @@ def build_edges(blocks: List[str],
 # APX emission
 # ---------------------------
 
-def emit_apx(ids: List[str],
-             id_to_text: Dict[str,str],
-             edges: Set[Tuple[int,int]],
-             provenance: Optional[Dict] = None) -> str:
-    # Sanitize & deduplicate atom names
-    apx_atoms = make_unique([sanitize_atom(i) for i in ids])
-    # Map index -> atom
-    id_atom = {i: apx_atoms[i] for i in range(len(ids))}
+def iter_apx_lines(ids: List[str],
+                   id_to_text: Dict[str,str],
+                   edges: Set[Tuple[int,int]],
+                   provenance: Optional[Dict] = None) -> Iterator[str]:
+    """Yield the APX output line by line (without newlines)."""
+    # Sanitize & deduplicate atom names; index -> atom
+    atoms = make_unique(ids)  # sanitizes each id
 
-    lines: List[str] = []
     # Header as comments
-    lines.append("% APX generated by nl2apx.py")
-    lines.append("% Arguments and mapping:")
-    for i, id_ in enumerate(ids):
+    yield "% APX generated by nl2apx.py"
+    yield "% Arguments and mapping:"
+    for atom, id_ in zip(atoms, ids):
         text = id_to_text[id_].replace("\n"," ").strip()
-        lines.append(f"%   {id_atom[i]} == {id_} :: {text[:80]}")
+        yield f"%   {atom} == {id_} :: {text[:80]}"
 
     # arg/1
-    for i in range(len(ids)):
-        lines.append(f"arg({id_atom[i]}).")
+    yield from map("arg({}).".format, atoms)
 
     # att/2
-    lines.append("% Attacks")
-    for (i, j) in sorted(edges):
-        lines.append(f"att({id_atom[i]},{id_atom[j]}).")
+    yield "% Attacks"
+    yield from ("att(%s,%s)." % (atoms[i], atoms[j]) for i, j in sorted(edges))
 
     # Optional provenance
     if provenance:
-        lines.append("% --- provenance (indices; 0-based) ---")
+        yield "% --- provenance (indices; 0-based) ---"
         for k, v in provenance.items():
             if k in ("explicit_edges","heuristic_edges","llm_edges","final_edges"):
-                lines.append(f"% {k}: {v}")
-    return "\n".join(lines) + "\n"
+                yield f"% {k}: {v}"
+
+def emit_apx(ids: List[str],
+             id_to_text: Dict[str,str],
+             edges: Set[Tuple[int,int]],
+             provenance: Optional[Dict] = None) -> str:
+    return "\n".join(iter_apx_lines(ids, id_to_text, edges, provenance)) + "\n"
+
+def write_apx(out: TextIO,
+              ids: List[str],
+              id_to_text: Dict[str,str],
+              edges: Set[Tuple[int,int]],
+              provenance: Optional[Dict] = None) -> None:
+    """Stream the APX output to `out` without building it in memory."""
+    out.writelines(line + "\n" for line in iter_apx_lines(ids, id_to_text, edges, provenance))
 
 # ---------------------------
 # CLI
@@ -356,6 +654,8 @@ def main():
     ap.add_argument("--llm-threshold", type=float, default=0.55, help="Confidence cutoff for LLM edges.")
     ap.add_argument("--llm-mode", default="augment", choices=["augment","override"],
                     help="Combine with other edges (augment) or use only LLM edges (override).")
+    ap.add_argument("--llm-window", type=int, default=None,
+                    help="Split inputs longer than this many blocks into overlapping windows queried concurrently (default: one prompt).")
     ap.add_argument("--provenance", action="store_true", help="Include provenance comments.")
     args = ap.parse_args()
 
@@ -368,13 +668,14 @@ def main():
         use_llm=args.use_llm,
         llm_threshold=args.llm_threshold,
         llm_mode=args.llm_mode,
+        llm_window=args.llm_window,
     )
-    apx = emit_apx(ids, id_to_text, edges, provenance=(meta if args.provenance else None))
+    provenance = meta if args.provenance else None
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
-            f.write(apx)
+            write_apx(f, ids, id_to_text, edges, provenance=provenance)
     else:
-        print(apx, end="")
+        write_apx(sys.stdout, ids, id_to_text, edges, provenance=provenance)
 
 if __name__ == "__main__":
     main()
@@ -48,10 +48,13 @@ def main():
     if args.md_out:
         Path(args.md_out).write_text(md, encoding="utf-8")
     else:
-        print(md)
+        sys.stdout.write(md)
+        sys.stdout.write("\n")
 
     if args.json_out:
-        Path(args.json_out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        # json.dump streams chunks to the file instead of building one big string
+        with open(args.json_out, "w", encoding="utf-8") as fp:
+            json.dump(result, fp, ensure_ascii=False, indent=2)
 
 if __name__ == "__main__":
     main()
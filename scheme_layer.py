@@ -1,13 +1,56 @@
 
 from __future__ import annotations
-import json, re
+import asyncio, json, re
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from functools import lru_cache
+from typing import Any, List, Dict, Sequence, Tuple, Optional, Union
 from pydantic import BaseModel, Field
 from google.genai import types
 
-from llm import init_llm_client, generate_content
-from schemes_io import load_schemes, ALLOWED_BY_RULE_TYPE
+from llm import get_shared_llm_client, generate_content, generate_content_async
+from schemes_io import load_schemes, load_scheme_cq_ids, ALLOWED_BY_RULE_TYPE
+
+# Explicit CQ answer lines ("CQ: <id> ..."); compiled once, case-insensitive
+_EXPLICIT_CQ_RE = re.compile(r"(?mi)^\s*cq\s*:\s*([A-Za-z0-9_\-]+)")
+
+# The shared allowed map, serialized once per process for the default case
+_DEFAULT_ALLOWED_MAP_JSON = json.dumps(ALLOWED_BY_RULE_TYPE, ensure_ascii=False)
+
+@lru_cache(maxsize=4)
+def _scheme_to_cqs_json(schemes_path: str) -> str:
+    # Minimal scheme->CQids dict for the LLM; shared by every assigner on a path
+    return json.dumps(load_scheme_cq_ids(schemes_path), ensure_ascii=False)
+
+# Prompt for the scheme call, stripped once; filled with str.format per analyze()
+_PROMPT_TEMPLATE = """
+You classify each inference in an argument into a standard argumentation scheme and list
+the most relevant critical questions (CQs). Use ONLY the allowed schemes for each inference's rule_type.
+
+ALLOWED BY RULE TYPE (single source of truth):
+{allowed}
+
+SCHEMES (ids → CQ ids):
+{schemes}
+
+TOP-K CQs per inference: {k}
+
+INPUT:
+CLAIMS:
+{claims}
+INFERENCES (each has rule_type):
+{infs}
+
+ORIGINAL ARGUMENT TEXT (may include explicit answers like 'CQ: <id> — ...'):
+{text}
+
+TASK:
+For each inference, output a JSON object:
+  - scheme_id: choose ONE from allowed_map[rule_type]
+  - required_cqs: list of up to TOP-K CQ ids *from that scheme* that are most relevant here
+Do not include more than TOP-K CQs for any single inference.
+
+Return JSON with schema: {{"items":[...]}} only.
+""".strip()
 
 # --------- Pydantic IO schema for the scheme call ---------
 
@@ -48,15 +91,19 @@ class SchemeAssigner:
         schemes_path: str = "schemes.json",
         topk: int = 2,
         temperature: float = 0.0,
-        allowed_map: Optional[Dict[str, List[str]]] = None,
+        allowed_map: Optional[Dict[str, Sequence[str]]] = None,
     ):
         # Load schemes from the shared loader (cached)
         self.schemes_path = schemes_path
         self.schemes = load_schemes(schemes_path)
         self.topk = max(0, int(topk))
         self.allowed_map = allowed_map or ALLOWED_BY_RULE_TYPE
+        # Prompt-invariant JSON views, serialized once per assigner
+        self._allowed_map_json = (_DEFAULT_ALLOWED_MAP_JSON if allowed_map is None
+                                  else json.dumps(self.allowed_map, ensure_ascii=False))
+        self._scheme_to_cqs_json = _scheme_to_cqs_json(schemes_path)
 
-        self.client = init_llm_client()
+        self.client = get_shared_llm_client()
         self.config = types.GenerateContentConfig(
             temperature=temperature,
             response_mime_type="application/json",
@@ -66,74 +113,81 @@ class SchemeAssigner:
 
     def analyze(self, argument, original_text: str, topk: Optional[int] = None) -> SchemeFacts:
         k = self.topk if topk is None else max(0, int(topk))
+        prompt = self._prompt(argument, original_text, k)
+        resp = generate_content(self.client, contents=prompt, config=self.config)
+        return self._facts(resp.text, original_text, k)
+
+    async def analyze_async(self, argument, original_text: str, topk: Optional[int] = None) -> SchemeFacts:
+        """Async variant of analyze, for assigning schemes to several arguments concurrently"""
+        k = self.topk if topk is None else max(0, int(topk))
+        prompt = self._prompt(argument, original_text, k)
+        resp = await generate_content_async(self.client, contents=prompt, config=self.config)
+        return self._facts(resp.text, original_text, k)
 
+    def _prompt(self, argument, original_text: str, k: int) -> str:
         # Build compact JSON views for the prompt
         claims_json = [{"id": c.id, "content": c.content, "type": c.type} for c in argument.claims]
         infs_json = [{"from_claims": i.from_claims, "to_claim": i.to_claim, "rule_type": i.rule_type}
                      for i in argument.inferences]
 
-        # Prepare a minimal scheme->CQids dict for the LLM
-        scheme_to_cqs = {
-            sid: [cq["id"] for cq in s.get("critical_questions", [])]
-            for sid, s in self.schemes.items()
-            if not str(sid).startswith("_")  # skip metadata blocks like _meta
-        }
-
-        prompt = f"""
-You classify each inference in an argument into a standard argumentation scheme and list
-the most relevant critical questions (CQs). Use ONLY the allowed schemes for each inference's rule_type.
-
-ALLOWED BY RULE TYPE (single source of truth):
-{json.dumps(self.allowed_map, ensure_ascii=False)}
-
-SCHEMES (ids → CQ ids):
-{json.dumps(scheme_to_cqs, ensure_ascii=False)}
-
-TOP-K CQs per inference: {k}
-
-INPUT:
-CLAIMS:
-{json.dumps(claims_json, ensure_ascii=False)}
-INFERENCES (each has rule_type):
-{json.dumps(infs_json, ensure_ascii=False)}
-
-ORIGINAL ARGUMENT TEXT (may include explicit answers like 'CQ: <id> — ...'):
-{original_text}
-
-TASK:
-For each inference, output a JSON object:
-  - scheme_id: choose ONE from allowed_map[rule_type]
-  - required_cqs: list of up to TOP-K CQ ids *from that scheme* that are most relevant here
-Do not include more than TOP-K CQs for any single inference.
-
-Return JSON with schema: {{"items":[...]}} only.
-""".strip()
+        prompt = _PROMPT_TEMPLATE.format(
+            allowed=self._allowed_map_json,
+            schemes=self._scheme_to_cqs_json,
+            k=k,
+            claims=json.dumps(claims_json, ensure_ascii=False),
+            infs=json.dumps(infs_json, ensure_ascii=False),
+            text=original_text,
+        )
+        return prompt
 
-        resp = generate_content(self.client, contents=prompt, config=self.config)
-        analysis = SchemeAnalysis.model_validate_json(resp.text)
+    def _facts(self, response_text: str, original_text: str, k: int) -> SchemeFacts:
+        analysis = SchemeAnalysis.model_validate_json(response_text)
 
         # Aggregate per conclusion id (to_claim): union required CQs across its incoming inferences.
-        per_to_required: Dict[str, List[str]] = {}
+        # Dict keys act as an insertion-ordered set (order matters for the top-k cap).
+        per_to_required: Dict[str, Dict[str, None]] = {}
         for item in analysis.items:
-            cur = per_to_required.setdefault(item.to_claim, [])
-            for cq in item.required_cqs:
-                if cq not in cur:
-                    cur.append(cq)
+            per_to_required.setdefault(item.to_claim, {}).update(dict.fromkeys(item.required_cqs))
 
         # Parse explicit CQ answers present in the text, e.g., lines like:
         #   "CQ: alternatives — ..."
         #   "cq: ACHIEVES - ..."
-        explicit = set(m.lower() for m in re.findall(r"^\s*cq\s*:\s*([A-Za-z0-9_\-]+)", original_text, flags=re.M))
+        explicit = set(m.lower() for m in _EXPLICIT_CQ_RE.findall(original_text))
 
         requires: List[Tuple[str, str]] = []
         answered: List[Tuple[str, str]] = []
 
+        # Lowercase each distinct CQ id once (ids recur across conclusions);
+        # skipped entirely when the text has no explicit answers.
+        lowered: Dict[str, str] = {}
+
         for to_claim, cqs in per_to_required.items():
             # Cap to top-k per conclusion
-            capped = cqs[:k] if k > 0 else []
+            capped = list(cqs)[:k] if k > 0 else []
             for cq in capped:
                 requires.append((to_claim, cq))
-                if cq.lower() in explicit:
-                    answered.append((to_claim, cq))
+                if explicit:
+                    low = lowered.get(cq)
+                    if low is None:
+                        low = lowered[cq] = cq.lower()
+                    if low in explicit:
+                        answered.append((to_claim, cq))
 
         return SchemeFacts(requires=requires, answered=answered, raw_items=list(analysis.items))
+
+
+async def analyze_all_async(assigner: SchemeAssigner, items: List[Tuple[Any, str]],
+                            topk: Optional[int] = None,
+                            concurrency: int = 8) -> List[Union[SchemeFacts, Exception]]:
+    """Run assigner.analyze over many (argument, original_text) pairs with at most
+    `concurrency` LLM calls in flight, sharing the assigner's client.
+
+    Results are returned in input order; a failed call yields its exception.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(argument, text: str):
+        async with sem:
+            return await assigner.analyze_async(argument, text, topk=topk)
+
+    return await asyncio.gather(*(one(a, t) for a, t in items), return_exceptions=True)
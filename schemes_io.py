@@ -1,50 +1,40 @@
 
 from __future__ import annotations
 import json
+import mmap
 from functools import lru_cache
 from typing import Dict, Tuple, Any, Optional
 
+# Optional faster JSON decoding for the schemes catalog (stdlib json also takes bytes)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
 DEFAULT_SCHEMES_PATH = "schemes.json"
 
 @lru_cache(maxsize=1)
 def load_schemes(path: str = DEFAULT_SCHEMES_PATH) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-@lru_cache(maxsize=1)
-def load_cq_labels(path: str = DEFAULT_SCHEMES_PATH) -> Dict[str, Tuple[str, str]]:
-    data = load_schemes(path)
-    labels: Dict[str, Tuple[str, str]] = {}
-    for sid, scheme in data.items():
-        if sid.startswith("_"):
-            continue
-        for cq in scheme.get("critical_questions", []):
-            cid = cq["id"]
-            title = cq.get("title") or cid
-            short = cq.get("short") or ""
-            if cid not in labels:
-                labels[cid] = (title, short)
-    return labels
+    with open(path, "rb") as f:
+        if orjson is not None:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):  # empty file / unmappable (pipes, some platforms)
+                mm = None
+            if mm is not None:
+                # orjson parses straight from the mapped pages: no intermediate bytes copy
+                with mm, memoryview(mm) as buf:
+                    return orjson.loads(buf)
+        return _json_loads(f.read())
 
-@lru_cache(maxsize=1)
-def load_cq_meta(path: str = DEFAULT_SCHEMES_PATH):
-    data = load_schemes(path)
-    meta: Dict[str, Dict[str, Any]] = {}
-    for sid, scheme in data.items():
-        if sid.startswith("_"):
-            continue
-        for cq in scheme.get("critical_questions", []):
-            meta[cq["id"]] = cq
-    return meta
-
-def format_cq_one_liner(cq_id: str, path: str = DEFAULT_SCHEMES_PATH) -> str:
-    meta = load_cq_meta(path).get(cq_id, {"title": cq_id, "short": ""})
+def _one_liner(cq_id: str, meta: Dict[str, Any]) -> str:
     title = meta.get("title", cq_id)
     short = meta.get("short", "").rstrip(".")
     return f"{title} — {short}." if short else title
 
-def format_cq_extended(cq_id: str, path: str = DEFAULT_SCHEMES_PATH) -> str:
-    meta = load_cq_meta(path).get(cq_id, {"title": cq_id})
+def _extended(cq_id: str, meta: Dict[str, Any]) -> str:
     parts = [meta.get("title", cq_id)]
     q = meta.get("question")
     if q:
@@ -57,13 +47,56 @@ def format_cq_extended(cq_id: str, path: str = DEFAULT_SCHEMES_PATH) -> str:
         parts.append(f"Why it matters: {why}")
     return " — ".join(parts)
 
+@lru_cache(maxsize=1)
+def _load_all(path: str = DEFAULT_SCHEMES_PATH):
+    """One walk over the catalog -> (CQ labels, CQ meta, scheme -> CQ ids,
+    one-liner texts, extended texts)."""
+    data = load_schemes(path)
+    labels: Dict[str, Tuple[str, str]] = {}
+    meta: Dict[str, Dict[str, Any]] = {}
+    cq_ids: Dict[str, Tuple[str, ...]] = {}
+    for sid, scheme in data.items():
+        if sid.startswith("_"):
+            continue
+        ids = []
+        for cq in scheme.get("critical_questions", []):
+            cid = cq["id"]
+            ids.append(cid)
+            meta[cid] = cq
+            if cid not in labels:
+                labels[cid] = (cq.get("title") or cid, cq.get("short") or "")
+        cq_ids[sid] = tuple(ids)
+    # Rendered from the final meta (a later duplicate id wins, as in load_cq_meta)
+    one = {cid: _one_liner(cid, m) for cid, m in meta.items()}
+    ext = {cid: _extended(cid, m) for cid, m in meta.items()}
+    return labels, meta, cq_ids, one, ext
+
+def load_cq_labels(path: str = DEFAULT_SCHEMES_PATH) -> Dict[str, Tuple[str, str]]:
+    return _load_all(path)[0]
+
+def load_cq_meta(path: str = DEFAULT_SCHEMES_PATH):
+    return _load_all(path)[1]
+
+def load_scheme_cq_ids(path: str = DEFAULT_SCHEMES_PATH) -> Dict[str, Tuple[str, ...]]:
+    """Scheme id -> its CQ ids (metadata blocks like _meta skipped)."""
+    return _load_all(path)[2]
+
+def format_cq_one_liner(cq_id: str, path: str = DEFAULT_SCHEMES_PATH) -> str:
+    # Unknown ids render as the bare id (title defaults to the id, no hint)
+    return _load_all(path)[3].get(cq_id, cq_id)
+
+def format_cq_extended(cq_id: str, path: str = DEFAULT_SCHEMES_PATH) -> str:
+    return _load_all(path)[4].get(cq_id, cq_id)
+
+# Rule type -> allowed scheme ids. Immutable tuples: shared by every assigner and
+# serialized into prompts in this order.
 ALLOWED_BY_RULE_TYPE = {
-    "deductive": [
+    "deductive": (
         "rules_to_case",
         "analogy",
         "definition",
-    ],
-    "inductive": [
+    ),
+    "inductive": (
         "example",
         "analogy",
         "sign",
@@ -71,17 +104,17 @@ ALLOWED_BY_RULE_TYPE = {
         "cause_to_effect",
         "expert_opinion",
         "position_to_know",
-    ],
-    "causal": [
+    ),
+    "causal": (
         "cause_to_effect",
         "correlation_to_causation",
         "sign",
         "practical_reasoning",
         "argument_from_consequences",
-    ],
-    "definitional": [
+    ),
+    "definitional": (
         "definition",
         "rules_to_case",
         "analogy",
-    ],
+    ),
 }
@@ -2,16 +2,33 @@
 # server.py — thin wrapper around unified_core.generate_unified_report
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
 import os
+from collections import OrderedDict
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from unified_core import generate_unified_report, HAVE_AD
-from llm import set_request_api_key
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 
-app = FastAPI(title="Argument Debugger — unified", version="2.0")
+import unified_core
+from unified_core import generate_unified_report, stream_unified_markdown, HAVE_AD
+from llm import llm_config_digest, set_request_api_key
+
+# The server's entry point is __main__-guarded, so large AFs may use the
+# semantics process pool; AF_PARALLEL_SEMANTICS=0 turns it off.
+unified_core.PARALLEL_SEMANTICS = os.getenv("AF_PARALLEL_SEMANTICS", "1") == "1"
+
+app = FastAPI(title="Argument Debugger — unified", version="2.0",
+              default_response_class=DefaultResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,19 +52,43 @@ class UnifiedRequest(BaseModel):
     cqs: bool = False
     api_key: Optional[str] = None  # Add API key to request body
 
+# Recent /api/unified responses keyed by the report options and the resolved
+# LLM configuration (llm_config_digest), like the LLM-derived caches beneath
+# it (AF builds, LLM edges, ad.py stances). Reports whose LLM edge inference
+# failed are not cached. Only touched from the event loop, so no lock.
+_REPORT_CACHE_MAX = 128
+_report_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+
+def _report_key(req: UnifiedRequest) -> tuple:
+    # call after set_request_api_key, so the digest covers this request's key
+    return (hashlib.blake2b(req.text.encode("utf-8")).digest(), llm_config_digest(),
+            req.relation, req.use_llm, req.llm_mode, req.llm_threshold, req.jaccard,
+            req.min_overlap, req.target, req.winners, req.repair, req.cqs)
+
 @app.get("/api/health")
 def health():
     return {"ok": True, "ad_available": HAVE_AD}
 
 @app.post("/api/unified")
-def api_unified(req: UnifiedRequest, x_api_key: Optional[str] = Header(None)):
+async def api_unified(req: UnifiedRequest, response: Response, x_api_key: Optional[str] = Header(None)):
     # Set the request-scoped API key (prefer header, fallback to body)
     api_key = x_api_key or req.api_key
     if api_key:
         set_request_api_key(api_key)
-    
+
+    key = _report_key(req)
+    cached = _report_cache.get(key)
+    if cached is not None:
+        _report_cache.move_to_end(key)
+        response.headers["X-AF-Cache"] = "HIT"
+        return copy.deepcopy(cached)
+    response.headers["X-AF-Cache"] = "MISS"
+
     try:
-        result = generate_unified_report(
+        # Off the event loop: clingo and ad.py block. to_thread carries the
+        # request-scoped key along in a copy of this context.
+        result = await asyncio.to_thread(
+            generate_unified_report,
             text=req.text,
             relation=req.relation,
             use_llm=req.use_llm,
@@ -61,9 +102,61 @@ def api_unified(req: UnifiedRequest, x_api_key: Optional[str] = Header(None)):
             cqs=req.cqs,
             filename="session",
         )
-        return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Unified analysis failed: {e}")
+    if not result["af"]["llm_errors"]:
+        _report_cache[key] = copy.deepcopy(result)
+        if len(_report_cache) > _REPORT_CACHE_MAX:
+            _report_cache.popitem(last=False)
+    return result
+
+@app.post("/api/unified/md")
+def api_unified_md(req: UnifiedRequest, x_api_key: Optional[str] = Header(None)):
+    # Same report as /api/unified["markdown"], streamed as text/markdown chunk by
+    # chunk (AF part, then one stance at a time) instead of inside a JSON blob.
+    api_key = x_api_key or req.api_key
+    chunks = stream_unified_markdown(
+        text=req.text,
+        relation=req.relation,
+        use_llm=req.use_llm,
+        llm_mode=req.llm_mode,
+        llm_threshold=req.llm_threshold,
+        jaccard=req.jaccard,
+        min_overlap=req.min_overlap,
+        target=req.target,
+        winners_semantics=req.winners,
+        repair_stance=req.repair,
+        cqs=req.cqs,
+        filename="session",
+    )
+
+    # The first chunk carries the whole AF analysis: produce it before
+    # responding, so setup errors are a 400 as on /api/unified; only failures
+    # after streaming has started are reported inline.
+    if api_key:
+        set_request_api_key(api_key)
+    try:
+        first = next(chunks, "")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Unified analysis failed: {e}")
+
+    def body():
+        yield first
+        # Each chunk is produced in a worker thread with a fresh context,
+        # so re-set the request-scoped key before advancing the generator.
+        while True:
+            if api_key:
+                set_request_api_key(api_key)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            except Exception as e:
+                yield f"\n\n_Unified analysis failed: {e}_\n"
+                return
+            yield chunk
+
+    return StreamingResponse(body(), media_type="text/markdown; charset=utf-8")
 
 if __name__ == "__main__":
     import uvicorn
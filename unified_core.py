@@ -1,12 +1,23 @@
 # unified_core.py
 from __future__ import annotations
 
+import contextvars
+import copy
+import hashlib
+import io
 import os
-import tempfile
-from typing import Any, Dict, List, Optional, Set, Tuple
+import re
+import threading
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 
 import nl2apx as NL
 import af_clingo
+from llm import llm_config_digest
 
 try:
     import ad as AD
@@ -20,16 +31,27 @@ except Exception:
 # AF build & sanitization
 # -------------------------
 
+# one pass: runs of non-alphanumerics, underscores included, become a single "_"
+_RE_NONALNUM = re.compile(r"[^a-z0-9]+")
+_RE_ALPHA = re.compile(r"[a-z]")
+
 def sanitize_atom(s: str) -> str:
-    import re
     s0 = (s or "").strip().lower()
-    s1 = re.sub(r"[^a-z0-9_]+", "_", s0)
-    if not re.match(r"^[a-z]", s1):
-        s1 = "n_" + s1
-    s1 = re.sub(r"__+", "_", s1).strip("_")
+    s1 = _RE_NONALNUM.sub("_", s0)
+    if not _RE_ALPHA.match(s1):
+        s1 = ("n" if s1[:1] == "_" else "n_") + s1
+    s1 = s1.strip("_")
     return s1 or "n"
 
 
+# Recent AF builds keyed by (blake2b(text), build options); the UI often
+# re-submits the same text with only report options changed. Server requests
+# run in worker threads, hence the lock.
+_AF_CACHE_MAX = 128
+_af_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_af_cache_lock = threading.Lock()
+
+
 def build_af_from_text(
     text: str,
     relation: str = "auto",
@@ -40,42 +62,64 @@ def build_af_from_text(
     llm_mode: str = "augment",
 ):
     """Build AF from raw text (blocks separated by blank lines), returning
-    ids, id2text, atoms, attacks(set of (a,b)), id2atom, atom2id, meta."""
-    with tempfile.NamedTemporaryFile("w+", delete=False, suffix=".txt") as tf:
-        tf.write(text or "")
-        tmp_path = tf.name
-    try:
-        blocks = NL.parse_blocks(tmp_path)
-        ids, id2text, idx_edges, meta = NL.build_edges(
-            blocks,
-            relation_mode=relation,
-            jac_threshold=jaccard,
-            min_overlap=min_overlap,
-            use_llm=use_llm,
-            llm_threshold=llm_threshold,
-            llm_mode=llm_mode,
-        )
-    finally:
-        try: os.remove(tmp_path)
-        except Exception: pass
+    ids, id2text, atoms, attacks(frozenset of (a,b)), id2atom, atom2id, meta.
+    Results are memoized per (text, options, LLM configuration if use_llm),
+    except builds whose LLM edge inference failed (meta["llm_errors"]);
+    callers get fresh containers (attacks is immutable and shared)."""
+    # LLM builds are per resolved API key: another caller's edges must not
+    # stand in for this caller's own (possibly failing) LLM call
+    key = (hashlib.blake2b((text or "").encode("utf-8")).digest(),
+           relation, jaccard, min_overlap, use_llm, llm_threshold, llm_mode,
+           llm_config_digest() if use_llm else None)
+    with _af_cache_lock:
+        hit = _af_cache.get(key)
+        if hit is not None:
+            _af_cache.move_to_end(key)
+    if hit is None:
+        hit = _build_af(text, relation, jaccard, min_overlap, use_llm, llm_threshold, llm_mode)
+        if not hit[-1].get("llm_errors"):
+            with _af_cache_lock:
+                _af_cache[key] = hit
+                if len(_af_cache) > _AF_CACHE_MAX:
+                    _af_cache.popitem(last=False)
+    ids, id2text, atoms, attacks, id2atom, atom2id, meta = hit
+    return (list(ids), dict(id2text), list(atoms), attacks,
+            dict(id2atom), dict(atom2id), dict(meta))
+
+
+def _build_af(text, relation, jaccard, min_overlap, use_llm, llm_threshold, llm_mode):
+    blocks = NL.parse_blocks_text(text or "")
+    ids, id2text, idx_edges, meta = NL.build_edges(
+        blocks,
+        relation_mode=relation,
+        jac_threshold=jaccard,
+        min_overlap=min_overlap,
+        use_llm=use_llm,
+        llm_threshold=llm_threshold,
+        llm_mode=llm_mode,
+    )
 
     # IDs → atoms (stable names)
+    # next suffix per base; the probe only runs when another base already took base_i
     id2atom: Dict[str, str] = {}
+    atoms: List[str] = []
     used = set()
+    last = Counter()
     for _id in ids:
         base = sanitize_atom(_id)
-        k = base; i = 1
+        i = last[base]
+        k = base if i == 0 else f"{base}_{i + 1}"
+        i += 1
         while k in used:
             i += 1; k = f"{base}_{i}"
-        id2atom[_id] = k; used.add(k)
+        last[base] = i
+        id2atom[_id] = k; used.add(k); atoms.append(k)
+    if len(id2atom) != len(atoms):  # repeated ID directives: the last atom wins
+        atoms = [id2atom[_id] for _id in ids]
     atom2id = {v: k for k, v in id2atom.items()}
 
     # idx_edges → attacks in atom space
-    atoms = [id2atom[_id] for _id in ids]
-    attacks: Set[Tuple[str,str]] = set()
-    L = list(ids)
-    for (i, j) in idx_edges:
-        attacks.add((id2atom[L[i]], id2atom[L[j]]))
+    attacks: FrozenSet[Tuple[str,str]] = frozenset((atoms[i], atoms[j]) for (i, j) in idx_edges)
 
     return ids, id2text, atoms, attacks, id2atom, atom2id, meta
 
@@ -84,18 +128,29 @@ def build_af_from_text(
 # Semantics & insights
 # -------------------------
 
-def compute_semantics(atoms: List[str], attacks: Set[Tuple[str,str]]):
-    return dict(
-        grounded=list(af_clingo.grounded(atoms, attacks)),
-        preferred=[list(S) for S in af_clingo.preferred(atoms, attacks)],
-        stable=[list(S) for S in af_clingo.stable(atoms, attacks)],
-        complete=[list(S) for S in af_clingo.complete(atoms, attacks)],
-        stage=[list(S) for S in af_clingo.stage(atoms, attacks)],
-        semi_stable=[list(S) for S in af_clingo.semi_stable(atoms, attacks)],
-    )
+# Opt-in (AF_PARALLEL_SEMANTICS=1, e.g. for the server): AFs at least
+# PARALLEL_SEMANTICS_MIN_ARGS large solve their semantics in af_clingo's
+# process pool; below that, worker round-trips cost more than the solves.
+# Off by default because the pool's workers re-import the caller's __main__,
+# which then needs an `if __name__ == "__main__":` guard.
+PARALLEL_SEMANTICS = os.getenv("AF_PARALLEL_SEMANTICS") == "1"
+PARALLEL_SEMANTICS_MIN_ARGS = 16
 
+def compute_semantics(atoms: List[str], attacks: AbstractSet[Tuple[str,str]]):
+    sem = _semantics(tuple(atoms), frozenset(attacks))
+    return {k: (list(v) if k == "grounded" else [list(S) for S in v]) for k, v in sem.items()}
 
-def id_attacks_from_atoms(attacks_atom: Set[Tuple[str,str]], atom2id: Dict[str,str]) -> Set[Tuple[str,str]]:
+
+@lru_cache(maxsize=128)
+def _semantics(atoms: Tuple[str, ...], attacks: FrozenSet[Tuple[str,str]]):
+    res = af_clingo.all_semantics(atoms, attacks,
+                                  parallel=PARALLEL_SEMANTICS and len(atoms) >= PARALLEL_SEMANTICS_MIN_ARGS)
+    sem = {name.replace("-", "_"): tuple(tuple(S) for S in fam)
+           for name, fam in res.items() if name != "grounded"}
+    return dict(grounded=tuple(res["grounded"]), **sem)
+
+
+def id_attacks_from_atoms(attacks_atom: AbstractSet[Tuple[str,str]], atom2id: Dict[str,str]) -> Set[Tuple[str,str]]:
     return {(atom2id[u], atom2id[v]) for (u, v) in attacks_atom}
 
 
@@ -114,72 +169,99 @@ def attacks_by_tag(ids: List[str], meta: Dict) -> Dict[str, List[Tuple[str,str]]
     }
 
 
-def grounded_fixpoint_depth(ids: List[str], id_attacks: Set[Tuple[str,str]]):
-    # Classic grounded iteration with per-node "entry" depth
-    attackers: Dict[str, Set[str]] = {x: set() for x in ids}
+_TAG_SHORT = {"explicit": "exp", "heuristic": "heu", "llm": "llm"}
+
+def attack_tags(attacks_tagged: Dict[str, List[Tuple[str,str]]]) -> Dict[Tuple[str,str], List[str]]:
+    """(u, v) -> short tags of the sources that proposed the edge, in tag order."""
+    tags_for: Dict[Tuple[str,str], List[str]] = {}
+    for tag, pairs in attacks_tagged.items():
+        short_tag = _TAG_SHORT[tag]
+        for uv in pairs:
+            tags_for.setdefault(uv, []).append(short_tag)
+    return tags_for
+
+
+AttackIndex = Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]
+
+def attack_index(ids: List[str], id_attacks: Set[Tuple[str,str]]) -> AttackIndex:
+    """(attackers_of, attacks_of) adjacency sets, built once and shared by the insight helpers."""
+    attackers_of: Dict[str, Set[str]] = {x: set() for x in ids}
     attacks_of: Dict[str, Set[str]] = {x: set() for x in ids}
     for u, v in id_attacks:
         attacks_of[u].add(v)
-        attackers[v].add(u)
+        attackers_of[v].add(u)
+    return attackers_of, attacks_of
 
-    def defended(S: Set[str], a: str) -> bool:
-        for b in attackers[a]:
-            if not any((c in S and (b in attacks_of[c])) for c in S):
-                return False
-        return True
 
-    S: Set[str] = set()
+def grounded_fixpoint_depth(ids: List[str], id_attacks: Set[Tuple[str,str]],
+                            index: Optional[AttackIndex] = None):
+    # Classic grounded iteration with per-node "entry" depth, as a worklist:
+    # a enters once all its attackers are defeated, one round after the last
+    # of them; FIFO order keeps rounds nondecreasing, so each attack is
+    # visited once instead of rescanning every argument per round.
+    attackers, attacks_of = index or attack_index(ids, id_attacks)
     depth: Dict[str, Optional[int]] = {x: None for x in ids}
-    k = 0
-    while True:
-        T = {a for a in ids if defended(S, a)}
-        if T == S:
-            break
-        k += 1
-        for a in (T - S):
-            depth[a] = k
-        S = T
+    pending = {a: len(bs) for a, bs in attackers.items()}
+    queue = deque(a for a, n in pending.items() if n == 0)
+    for a in queue:
+        depth[a] = 1
+    defeated: Set[str] = set()
+    while queue:
+        c = queue.popleft()
+        k = depth[c]
+        for b in attacks_of[c]:
+            if b in defeated:
+                continue
+            defeated.add(b)
+            for a in attacks_of[b]:
+                pending[a] -= 1
+                if pending[a] == 0:
+                    depth[a] = k + 1
+                    queue.append(a)
+    S = {a for a, d in depth.items() if d is not None}
     return S, depth
 
 
 def preferred_cards(ids: List[str], id2text: Dict[str,str], id2atom: Dict[str,str], sem: Dict[str, Any], k: int = 4):
     cards = []
+    # atom -> position in ids, so members come out in ids order without a scan of ids
+    pos = {id2atom[i]: n for n, i in enumerate(ids)}
     for S_atoms in (sem["preferred"] or [])[:k]:
-        Sset = set(S_atoms)
-        members = [i for i in ids if id2atom[i] in Sset]
+        members = [ids[n] for n in sorted({pos[a] for a in S_atoms if a in pos})]
         preview = "; ".join(short(id2text[i], 80) for i in members[:3])
         cards.append({"members": members, "preview": preview})
     return cards
 
 
-def winners(atoms: List[str], attacks: Set[Tuple[str,str]], mode: str):
+def winners(atoms: List[str], attacks: AbstractSet[Tuple[str,str]], mode: str):
+    # Read from the (cached) compute_semantics families, so stances come in
+    # the same order as the report's semantics and preferred cards.
     m = (mode or "preferred").lower()
-    if m == "grounded":   return [set(af_clingo.grounded(atoms, attacks))]
-    if m == "preferred":  return [set(S) for S in af_clingo.preferred(atoms, attacks)]
-    if m == "stable":     return [set(S) for S in af_clingo.stable(atoms, attacks)]
-    if m == "complete":   return [set(S) for S in af_clingo.complete(atoms, attacks)]
-    if m == "stage":      return [set(S) for S in af_clingo.stage(atoms, attacks)]
-    if m in ("semi-stable","semistable","semi_stable"): return [set(S) for S in af_clingo.semi_stable(atoms, attacks)]
-    raise ValueError(m)
+    key = "semi_stable" if m in ("semi-stable", "semistable") else m
+    sem = compute_semantics(atoms, attacks)
+    if key not in sem:
+        raise ValueError(m)
+    if key == "grounded":
+        return [set(sem["grounded"])]
+    return [set(S) for S in sem[key]]
 
 
 def why_not_target(target: Optional[str], ids: List[str], id2atom: Dict[str,str],
-                   id_attacks: Set[Tuple[str,str]], sem: Dict[str, Any]) -> Dict[str, Any]:
+                   id_attacks: Set[Tuple[str,str]], sem: Dict[str, Any],
+                   index: Optional[AttackIndex] = None) -> Dict[str, Any]:
     if not target or target not in ids:
         return {}
-    attackers_of: Dict[str, Set[str]] = {x: set() for x in ids}
-    attacks_of: Dict[str, Set[str]] = {x: set() for x in ids}
-    for u, v in id_attacks:
-        attackers_of[v].add(u)
-        attacks_of[u].add(v)
-    grounded_atoms = set(sem["grounded"])
-    grounded_ids   = {i for i in ids if id2atom[i] in grounded_atoms}
+    attackers_of, attacks_of = index or attack_index(ids, id_attacks)
+    # atoms are unique per id, so extensions map back to id-sets directly
+    atom2id = {a: i for i, a in id2atom.items()}
+    def to_ids(S_atoms) -> Set[str]:
+        return {atom2id[a] for a in S_atoms if a in atom2id}
+    grounded_ids = to_ids(sem["grounded"])
     target_in_grounded = target in grounded_ids
-    grounded_attack_set = {(g, t) for g in grounded_ids for t in attacks_of[g]}
-    roadblocks = [a for a in sorted(attackers_of[target]) if not any((g, a) in grounded_attack_set for g in grounded_ids)]
+    defeated_by_grounded = set().union(*(attacks_of[g] for g in grounded_ids))
+    roadblocks = [a for a in sorted(attackers_of[target]) if a not in defeated_by_grounded]
     # preferred coverage + persistent/soft attackers
-    pref = [set(S) for S in sem["preferred"] or []]
-    pref_ids = [{i for i in ids if id2atom[i] in S} for S in pref]
+    pref_ids = [to_ids(S) for S in sem["preferred"] or []]
     k = len(pref_ids)
     target_in_pref = sum(1 for S in pref_ids if target in S)
     if k > 0:
@@ -206,18 +288,49 @@ def why_not_target(target: Optional[str], ids: List[str], id2atom: Dict[str,str]
 # ad.py analysis
 # -------------------------
 
-def analyze_stance_with_ad(text: str, want_repair: bool = False, cqs: bool = False) -> Dict[str, Any]:
+# Recent ad.py results keyed by (blake2b(stance text), want_repair, cqs, LLM
+# configuration); distinct winning sets often concatenate to the same stance
+# text. ad.py parsing, CQs and repair are LLM calls, so results bought with one
+# API key are not served to another. Stances run in worker threads, hence the lock.
+_AD_CACHE_MAX = 256
+_ad_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_ad_cache_lock = threading.Lock()
+
+
+def analyze_stance_with_ad(text: str, want_repair: bool = False, cqs: bool = False,
+                           debugger: Any = None) -> Dict[str, Any]:
+    """ad.py parse/analysis (and optional repair) of one stance. Pass an
+    AD.ArgumentDebugger(cq=cqs) as `debugger` to reuse its parser, ASP analyzer
+    and repairer across stances; they keep no per-argument state.
+    Results are memoized per (text, want_repair, cqs, LLM configuration);
+    callers get a deep copy."""
     if not HAVE_AD:
         return {"error": "ad.py not available"}
-    parser = AD.ArgumentParser()
-    argument = parser.parse_argument(text)
+    key = (hashlib.blake2b((text or "").encode("utf-8")).digest(), want_repair, cqs,
+           llm_config_digest())
+    with _ad_cache_lock:
+        hit = _ad_cache.get(key)
+        if hit is not None:
+            _ad_cache.move_to_end(key)
+    if hit is None:
+        hit = _analyze_stance_with_ad(text, want_repair, cqs, debugger)
+        with _ad_cache_lock:
+            _ad_cache[key] = hit
+            if len(_ad_cache) > _AD_CACHE_MAX:
+                _ad_cache.popitem(last=False)
+    return copy.deepcopy(hit)
+
+
+def _analyze_stance_with_ad(text: str, want_repair: bool, cqs: bool, debugger: Any) -> Dict[str, Any]:
+    if debugger is None:
+        debugger = AD.ArgumentDebugger(debug=False, cq=cqs)
+    argument = debugger.parser.parse_argument(text)
     
     # Attach CQ analysis if enabled
     if cqs:
-        debugger = AD.ArgumentDebugger(debug=False, cq=cqs)
         debugger._attach_cq(argument, text)
     
-    issues = AD.ASPDebugger(debug=False, cq=cqs).analyze(argument)
+    issues = debugger.analyzer.analyze(argument)
     out = {
         "claims": [{"id": c.id, "type": c.type, "content": c.content} for c in argument.claims],
         "inferences": [{"from": i.from_claims, "to": i.to_claim, "rule_type": i.rule_type} for i in argument.inferences],
@@ -225,8 +338,7 @@ def analyze_stance_with_ad(text: str, want_repair: bool = False, cqs: bool = Fal
         "issues": [{"type": it.type, "description": it.description, "claims": it.involved_claims} for it in issues],
     }
     if want_repair and issues:
-        rep = AD.RepairGenerator(debug=False)
-        comm, clean = rep.generate_repair(text, argument, issues)
+        comm, clean = debugger.repairer.generate_repair(text, argument, issues)
         out["repair"] = {"commentary": comm, "clean_argument": clean}
     return out
 
@@ -236,12 +348,22 @@ def analyze_stance_with_ad(text: str, want_repair: bool = False, cqs: bool = Fal
 # -------------------------
 
 def short(s: str, n: int = 110) -> str:
-    s = (s or "").strip().replace("\n", " ")
+    if not s:
+        return ""
+    if len(s) <= n and "\n" not in s:
+        return s.strip()
+    s = s.strip().replace("\n", " ")
     return s if len(s) <= n else s[: n - 1] + "…"
 
+_MD_TABLE = str.maketrans({"|": "\\|"})
+
 def md_escape(s: str) -> str:
-    return (s or "").replace("|", "\\|")
+    return (s or "").translate(_MD_TABLE)
+
 
+_SEM_TABLE_HEAD = ("| ID | Atom | Grounded | Pref | Stable | Complete | Stage | SemiSt | Depth |\n"
+                   "|---:|:-----|:--------:|:----:|:------:|:--------:|:-----:|:------:|:-----:|\n")
+_SEM_TABLE_ROW = "| %s | `%s` | %s | %d/%d | %d/%d | %d/%d | %d/%d | %d/%d | %s |\n"
 
 def make_af_markdown(filename: str,
                      ids: List[str], id2text: Dict[str,str], id2atom: Dict[str,str],
@@ -250,147 +372,187 @@ def make_af_markdown(filename: str,
                      sem: Dict[str, Any],
                      depth: Dict[str, Optional[int]],
                      pref_cards: List[Dict[str, Any]],
-                     why: Dict[str, Any]) -> str:
-    lines = []
-    lines.append(f"# AF Report — {filename}")
-    lines.append("")
-    lines.append("## Arguments (ID → APX atom)")
+                     why: Dict[str, Any],
+                     tags_for: Optional[Dict[Tuple[str,str], List[str]]] = None) -> str:
+    buf = io.StringIO(); w = buf.write
+    w(f"# AF Report — {filename}\n\n")
+    w("## Arguments (ID → APX atom)\n")
     for i in ids:
-        lines.append(f"- **{i}** (`{id2atom[i]}`): {short(id2text[i])}")
-    lines.append("")
-    lines.append("## Attacks")
-    tag_map = {}
-    for tag, pairs in attacks_tagged.items():
-        for (u, v) in pairs:
-            tag_map.setdefault((u, v), []).append({"explicit":"exp","heuristic":"heu","llm":"llm"}[tag])
+        w(f"- **{i}** (`{id2atom[i]}`): {short(id2text[i])}\n")
+    w("\n## Attacks\n")
+    if tags_for is None:
+        tags_for = attack_tags(attacks_tagged)
     if not id_attacks:
-        lines.append("_none_")
+        w("_none_\n")
     else:
         for (u, v) in sorted(id_attacks):
-            tags = tag_map.get((u, v), [])
+            tags = tags_for.get((u, v), [])
             tstr = f" [{' ,'.join(tags)}]" if tags else ""
-            lines.append(f"- {u} ({id2atom[u]}) → {v} ({id2atom[v]}){tstr}")
-    lines.append("")
-    lines.append("## Semantics (membership & depth)")
-    lines.append("| ID | Atom | Grounded | Pref | Stable | Complete | Stage | SemiSt | Depth |")
-    lines.append("|---:|:-----|:--------:|:----:|:------:|:--------:|:-----:|:------:|:-----:|")
+            w(f"- {u} ({id2atom[u]}) → {v} ({id2atom[v]}){tstr}\n")
+    w("\n## Semantics (membership & depth)\n")
+    w(_SEM_TABLE_HEAD)
     # membership counts
-    mem = {}
     grounded_atoms = set(sem["grounded"])
-    for i in ids:
-        mem[i] = {"grounded": (id2atom[i] in grounded_atoms)}
     def cnt(fam: List[List[str]]):
-        c = {i:0 for i in ids}
-        for S in fam or []:
-            Sset = set(S)
-            for i in ids:
-                if id2atom[i] in Sset:
-                    c[i]+=1
-        return c, len(fam or [])
+        # one tally over the extensions' members, then a lookup per id
+        tally = Counter(a for S in fam or [] for a in set(S))
+        return {i: tally[id2atom[i]] for i in ids}, len(fam or [])
     cp, kp = cnt(sem["preferred"])
     cs, ks = cnt(sem["stable"])
     cc, kc = cnt(sem["complete"])
     cg, kg = cnt(sem["stage"])
     ce, ke = cnt(sem["semi_stable"])
     for i in ids:
-        g = "✓" if mem[i]["grounded"] else ""
-        p = f"{cp[i]}/{kp}"; s=f"{cs[i]}/{ks}"; c=f"{cc[i]}/{kc}"; st=f"{cg[i]}/{kg}"; se=f"{ce[i]}/{ke}"
-        d = depth.get(i) or ""
-        lines.append(f"| {i} | `{id2atom[i]}` | {g} | {p} | {s} | {c} | {st} | {se} | {d} |")
-    lines.append("")
+        a = id2atom[i]
+        w(_SEM_TABLE_ROW % (i, a, "✓" if a in grounded_atoms else "",
+                            cp[i], kp, cs[i], ks, cc[i], kc, cg[i], kg, ce[i], ke,
+                            depth.get(i) or ""))
     if pref_cards:
-        lines.append("## Preferred “stance cards”")
+        w("\n## Preferred “stance cards”\n")
         for idx, card in enumerate(pref_cards, 1):
             members = ", ".join(card["members"])
-            lines.append(f"**S{idx}** = {{ {members} }}")
-            lines.append(f"  - preview: {card['preview']}")
-        lines.append("")
+            w(f"**S{idx}** = {{ {members} }}\n")
+            w(f"  - preview: {card['preview']}\n")
     if why:
-        lines.append("## Why (not) target")
+        w("\n## Why (not) target\n")
         gi = "YES" if why.get("grounded_in") else "NO"
         pc = why.get("preferred_coverage") or [0,0]
-        lines.append(f"- In grounded? **{gi}**")
-        lines.append(f"- Preferred coverage: **{pc[0]}/{pc[1]}**")
+        w(f"- In grounded? **{gi}**\n")
+        w(f"- Preferred coverage: **{pc[0]}/{pc[1]}**\n")
         rb = why.get("grounded_roadblocks") or []
         if rb:
-            lines.append(f"- Grounded roadblocks (undefeated attackers): {', '.join(rb)}")
+            w(f"- Grounded roadblocks (undefeated attackers): {', '.join(rb)}\n")
         per = why.get("preferred_persistent_attackers") or []
         soft = why.get("preferred_soft_attackers") or []
-        lines.append(f"- Across preferred: persistent attackers: {', '.join(per) if per else '(none)'}; soft attackers: {', '.join(soft) if soft else '(none)'}")
-        lines.append("")
-    return "\n".join(lines)
+        w(f"- Across preferred: persistent attackers: {', '.join(per) if per else '(none)'}; soft attackers: {', '.join(soft) if soft else '(none)'}\n")
+    w("\n")
+    # sections end with a blank line; the report itself has no trailing newline
+    return buf.getvalue()[:-1]
+
+
+def _shared_ad_debugger(cqs: bool) -> Callable[[], Any]:
+    """One AD.ArgumentDebugger for all stances of a report, built on first use
+    (so reports with no analyzable stance never set up LLM clients)."""
+    lock = threading.Lock()
+    box: List[Any] = []
+    def get():
+        with lock:
+            if not box:
+                box.append(AD.ArgumentDebugger(debug=False, cq=cqs))
+        return box[0]
+    return get
+
+
+def _stance_markdown(idx: int, S_atoms: Set[str], id2text: Dict[str,str], id2atom: Dict[str,str],
+                     atom2id: Dict[str,str], repair: bool, cqs: bool,
+                     get_debugger: Optional[Callable[[], Any]] = None) -> str:
+    """Markdown for one winning set; every line is newline-terminated."""
+    buf = io.StringIO(); w = buf.write
+    mids = sorted([atom2id[a] for a in S_atoms])
+    w(f"## Stance S{idx} — members ({len(mids)}): {{ " + ", ".join(mids) + " }}\n")
+    for mid in mids:
+        w(f"- **{mid}** (`{id2atom[mid]}`): {short(id2text[mid])}\n")
+    w("\n")
+    stance_text = "\n\n".join([(id2text.get(mid) or "").strip() for mid in mids if (id2text.get(mid) or "").strip()]).strip()
+    if not stance_text:
+        w("_empty stance text_\n\n"); return buf.getvalue()
+    if HAVE_AD:
+        ad = analyze_stance_with_ad(stance_text, want_repair=repair, cqs=cqs,
+                                    debugger=get_debugger() if get_debugger else None)
+    else:
+        ad = {"error":"ad.py not available"}
+    if ad.get("error"):
+        w(f"_ad.py analysis skipped: {ad['error']}_\n\n"); return buf.getvalue()
+    claims = ad.get("claims") or []
+    infs   = ad.get("inferences") or []
+    goal   = ad.get("goal_claim") or "—"
+    issues = ad.get("issues") or []
+    w(f"**ad.py parse:** claims={len(claims)}, inferences={len(infs)}, goal={goal}\n")
+    w("\n")
+    w("**Claims parsed**\n")
+    if not claims:
+        w("_no claims parsed_\n")
+    else:
+        w("| Claim | Type | Text |\n"); w("|:-----:|:-----|:-----|\n")
+        for c in claims:
+            w(f"| `{c['id']}` | {c['type']} | {md_escape(short(c['content'], 140))} |\n")
+    w("\n")
+    w("**Inferences**\n")
+    cmap = {c["id"]: c["content"] for c in claims}
+    if not infs:
+        w("_no inferences_\n")
+    else:
+        for inf in infs:
+            frm = ", ".join(inf.get("from") or inf.get("from_claims", []))
+            to  = inf.get("to") or inf.get("to_claim")
+            rt  = inf.get("rule_type", "")
+            to_txt = short(cmap.get(to, ""), 140)
+            w(f"- [{frm}] → {to} ({rt}) — “{md_escape(to_txt)}”\n")
+    w("\n")
+    w("**Issues (detailed)**\n")
+    if not issues:
+        w("_no issues detected_\n")
+    else:
+        for t, group in groupby(sorted(issues, key=itemgetter("type")), key=itemgetter("type")):
+            w(f"**{t}**\n")
+            for it in group:
+                cl = it.get("claims") or []
+                annot = []
+                for cid in cl:
+                    txt = short(cmap.get(cid, ""), 140)
+                    annot.append(f"`{cid}` — “{md_escape(txt)}”")
+                ann = "; ".join(annot) if annot else "(no specific claims)"
+                w(f"- {it['description']} {ann}\n")
+    rep = ad.get("repair")
+    if rep and rep.get("commentary"):
+        w("\n")
+        w("**Repair commentary (excerpt)**\n")
+        comm = (rep["commentary"] or "").strip()
+        w(comm + "\n")
+    w("\n")
+    return buf.getvalue()
+
+
+# Stances analyzed by ad.py at once when a report has several winners
+STANCE_WORKERS = 4
+
+def iter_ad_markdown(ids: List[str], id2text: Dict[str,str], id2atom: Dict[str,str],
+                     sem_winners: List[Set[str]], atom2id: Dict[str,str],
+                     repair: bool = False, cqs: bool = False) -> Iterator[str]:
+    """make_ad_markdown one stance at a time, so callers can stream while the
+    remaining stances are still being analyzed."""
+    if not sem_winners:
+        yield "_No winning sets under this semantics._"
+        return
+    last = len(sem_winners)
+    get_debugger = _shared_ad_debugger(cqs) if HAVE_AD else None
+    if not HAVE_AD or last == 1:
+        chunks = (_stance_markdown(idx, S_atoms, id2text, id2atom, atom2id, repair, cqs, get_debugger)
+                  for idx, S_atoms in enumerate(sem_winners, 1))
+        for idx, chunk in enumerate(chunks, 1):
+            # drop the final newline to match "\n".join
+            yield chunk if idx < last else chunk[:-1]
+        return
+    # ad.py analyses are LLM-bound: run the stances concurrently, each in a copy
+    # of the caller's context (request-scoped API key), and yield them in order.
+    # If a stance fails or the consumer stops early, queued stances are cancelled
+    # instead of waited for (running ones still finish, in the background).
+    ex = ThreadPoolExecutor(max_workers=min(last, STANCE_WORKERS))
+    try:
+        futs = [ex.submit(contextvars.copy_context().run, _stance_markdown,
+                          idx, S_atoms, id2text, id2atom, atom2id, repair, cqs, get_debugger)
+                for idx, S_atoms in enumerate(sem_winners, 1)]
+        for idx, fut in enumerate(futs, 1):
+            chunk = fut.result()
+            yield chunk if idx < last else chunk[:-1]
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
 
 
 def make_ad_markdown(ids: List[str], id2text: Dict[str,str], id2atom: Dict[str,str],
                      sem_winners: List[Set[str]], atom2id: Dict[str,str],
                      repair: bool = False, cqs: bool = False) -> str:
-    if not sem_winners:
-        return "_No winning sets under this semantics._"
-    lines = []
-    for idx, S_atoms in enumerate(sem_winners, 1):
-        mids = sorted([atom2id[a] for a in S_atoms])
-        lines.append(f"## Stance S{idx} — members ({len(mids)}): {{ " + ", ".join(mids) + " }}")
-        for mid in mids:
-            lines.append(f"- **{mid}** (`{id2atom[mid]}`): {short(id2text[mid])}")
-        lines.append("")
-        stance_text = "\n\n".join([(id2text.get(mid) or "").strip() for mid in mids if (id2text.get(mid) or "").strip()]).strip()
-        if not stance_text:
-            lines.append("_empty stance text_"); lines.append(""); continue
-        ad = analyze_stance_with_ad(stance_text, want_repair=repair, cqs=cqs) if HAVE_AD else {"error":"ad.py not available"}
-        if ad.get("error"):
-            lines.append(f"_ad.py analysis skipped: {ad['error']}_"); lines.append(""); continue
-        claims = ad.get("claims") or []
-        infs   = ad.get("inferences") or []
-        goal   = ad.get("goal_claim") or "—"
-        issues = ad.get("issues") or []
-        lines.append(f"**ad.py parse:** claims={len(claims)}, inferences={len(infs)}, goal={goal}")
-        lines.append("")
-        lines.append("**Claims parsed**")
-        if not claims:
-            lines.append("_no claims parsed_")
-        else:
-            lines.append("| Claim | Type | Text |"); lines.append("|:-----:|:-----|:-----|")
-            for c in claims:
-                lines.append(f"| `{c['id']}` | {c['type']} | {md_escape(short(c['content'], 140))} |")
-        lines.append("")
-        lines.append("**Inferences**")
-        cmap = {c["id"]: c["content"] for c in claims}
-        if not infs:
-            lines.append("_no inferences_")
-        else:
-            for inf in infs:
-                frm = ", ".join(inf.get("from") or inf.get("from_claims", []))
-                to  = inf.get("to") or inf.get("to_claim")
-                rt  = inf.get("rule_type", "")
-                to_txt = short(cmap.get(to, ""), 140)
-                lines.append(f"- [{frm}] → {to} ({rt}) — “{md_escape(to_txt)}”")
-        lines.append("")
-        lines.append("**Issues (detailed)**")
-        if not issues:
-            lines.append("_no issues detected_")
-        else:
-            from collections import defaultdict
-            g = defaultdict(list)
-            for it in issues:
-                g[it["type"]].append(it)
-            for t in sorted(g):
-                lines.append(f"**{t}**")
-                for it in g[t]:
-                    cl = it.get("claims") or []
-                    annot = []
-                    for cid in cl:
-                        txt = short(cmap.get(cid, ""), 140)
-                        annot.append(f"`{cid}` — “{md_escape(txt)}”")
-                    ann = "; ".join(annot) if annot else "(no specific claims)"
-                    lines.append(f"- {it['description']} {ann}")
-        rep = ad.get("repair")
-        if rep and rep.get("commentary"):
-            lines.append("")
-            lines.append("**Repair commentary (excerpt)**")
-            comm = (rep["commentary"] or "").strip()
-            lines.append(comm)
-        lines.append("")
-    return "\n".join(lines)
+    return "".join(iter_ad_markdown(ids, id2text, id2atom, sem_winners, atom2id, repair=repair, cqs=cqs))
 
 
 def make_unified_markdown(filename: str,
@@ -403,9 +565,28 @@ def make_unified_markdown(filename: str,
                           why: Dict[str, Any],
                           winners_sets: List[Set[str]],
                           winners_name: str,
-                          repair: bool, cqs: bool = False) -> str:
-    af_md = make_af_markdown(filename, ids, id2text, id2atom, attacks_tagged, id_attacks, sem, depth, pref_cards, why)
-    ad_md = make_ad_markdown(ids, id2text, id2atom, winners_sets, atom2id, repair=repair, cqs=cqs)
+                          repair: bool, cqs: bool = False,
+                          tags_for: Optional[Dict[Tuple[str,str], List[str]]] = None) -> str:
+    return "".join(iter_unified_markdown(
+        filename, ids, id2text, id2atom, atom2id, attacks_tagged, id_attacks, sem, depth,
+        pref_cards, why, winners_sets, winners_name, repair, cqs=cqs, tags_for=tags_for))
+
+
+def iter_unified_markdown(filename: str,
+                          ids: List[str], id2text: Dict[str,str], id2atom: Dict[str,str], atom2id: Dict[str,str],
+                          attacks_tagged: Dict[str, List[Tuple[str,str]]],
+                          id_attacks: Set[Tuple[str,str]],
+                          sem: Dict[str, Any],
+                          depth: Dict[str, Optional[int]],
+                          pref_cards: List[Dict[str, Any]],
+                          why: Dict[str, Any],
+                          winners_sets: List[Set[str]],
+                          winners_name: str,
+                          repair: bool, cqs: bool = False,
+                          tags_for: Optional[Dict[Tuple[str,str], List[str]]] = None) -> Iterator[str]:
+    """make_unified_markdown in chunks: the AF part first, then one chunk per stance."""
+    af_md = make_af_markdown(filename, ids, id2text, id2atom, attacks_tagged, id_attacks, sem, depth, pref_cards, why,
+                             tags_for=tags_for)
     parts = [
         "# Unified AF + ad.py Report",
         "",
@@ -413,9 +594,10 @@ def make_unified_markdown(filename: str,
         af_md,
         "---",
         f"## Part 2 — Winners analyzed by ad.py (semantics: {winners_name})",
-        ad_md
+        "",
     ]
-    return "\n".join(parts)
+    yield "\n".join(parts)
+    yield from iter_ad_markdown(ids, id2text, id2atom, winners_sets, atom2id, repair=repair, cqs=cqs)
 
 
 # -------------------------
@@ -437,6 +619,62 @@ def generate_unified_report(
     cqs: bool = False,
     filename: str = "session",
 ) -> Dict[str, Any]:
+    md_args, grounded_ids, meta = _unified_analysis(
+        text, relation, use_llm, llm_mode, llm_threshold, jaccard, min_overlap,
+        target, max_pref_cards, winners_semantics)
+    unified_md = make_unified_markdown(filename=filename, repair=repair_stance, cqs=cqs, **md_args)
+    win_sets = md_args["winners_sets"]
+    return {
+        "markdown": unified_md,
+        "af": {
+            "ids": md_args["ids"], "id2text": md_args["id2text"],
+            "id2atom": md_args["id2atom"], "atom2id": md_args["atom2id"],
+            "attacks_by_tag": md_args["attacks_tagged"], "id_attacks": sorted(md_args["id_attacks"]),
+            "llm_errors": meta.get("llm_errors", []),
+        },
+        "semantics": md_args["sem"],
+        "insights": {
+            "grounded_ids": sorted(grounded_ids),
+            "defense_depth": md_args["depth"],
+            "preferred_cards": md_args["pref_cards"],
+            "why": md_args["why"],
+        },
+        "winners": {
+            "name": winners_semantics,
+            "count": len(win_sets),
+            "sets_atoms": [sorted(S) for S in win_sets],
+        },
+        "ad_available": HAVE_AD,
+    }
+
+
+def stream_unified_markdown(
+    text: str,
+    relation: str = "auto",
+    use_llm: bool = False,
+    llm_mode: str = "augment",
+    llm_threshold: float = 0.55,
+    jaccard: float = 0.45,
+    min_overlap: int = 3,
+    target: Optional[str] = None,
+    max_pref_cards: int = 4,
+    winners_semantics: str = "stable",
+    repair_stance: bool = False,
+    cqs: bool = False,
+    filename: str = "session",
+) -> Iterator[str]:
+    """The markdown of generate_unified_report, yielded in chunks (AF part, then
+    one chunk per stance as ad.py finishes it)."""
+    md_args, _, _ = _unified_analysis(
+        text, relation, use_llm, llm_mode, llm_threshold, jaccard, min_overlap,
+        target, max_pref_cards, winners_semantics)
+    yield from iter_unified_markdown(filename=filename, repair=repair_stance, cqs=cqs, **md_args)
+
+
+def _unified_analysis(text, relation, use_llm, llm_mode, llm_threshold, jaccard, min_overlap,
+                      target, max_pref_cards, winners_semantics):
+    """AF build, semantics and insights shared by the JSON report and the markdown
+    stream: (markdown builder kwargs, grounded ids, AF build meta)."""
     ids, id2text, atoms, attacks, id2atom, atom2id, meta = build_af_from_text(
         text=text,
         relation=relation,
@@ -446,39 +684,19 @@ def generate_unified_report(
         llm_threshold=llm_threshold,
         llm_mode=llm_mode,
     )
-    sem = compute_semantics(atoms, set(attacks))
-    id_att = id_attacks_from_atoms(set(attacks), atom2id)
+    sem = compute_semantics(atoms, attacks)
+    id_att = id_attacks_from_atoms(attacks, atom2id)
     atk_by_tag = attacks_by_tag(ids, meta)
-    grounded_ids, depth = grounded_fixpoint_depth(ids, id_att)
+    index = attack_index(ids, id_att)
+    grounded_ids, depth = grounded_fixpoint_depth(ids, id_att, index)
     cards = preferred_cards(ids, id2text, id2atom, sem, k=max_pref_cards)
-    why = why_not_target(target, ids, id2atom, id_att, sem) if target else {}
+    why = why_not_target(target, ids, id2atom, id_att, sem, index) if target else {}
     # winners (shared graph)
-    win_sets = winners(atoms, set(attacks), winners_semantics)
-    unified_md = make_unified_markdown(
-        filename=filename,
+    win_sets = winners(atoms, attacks, winners_semantics)
+    md_args = dict(
         ids=ids, id2text=id2text, id2atom=id2atom, atom2id=atom2id,
-        attacks_tagged=atk_by_tag, id_attacks=id_att,
+        attacks_tagged=atk_by_tag, tags_for=attack_tags(atk_by_tag), id_attacks=id_att,
         sem=sem, depth=depth, pref_cards=cards, why=why,
-        winners_sets=win_sets, winners_name=winners_semantics, repair=repair_stance,
-        cqs=cqs
+        winners_sets=win_sets, winners_name=winners_semantics,
     )
-    return {
-        "markdown": unified_md,
-        "af": {
-            "ids": ids, "id2text": id2text, "id2atom": id2atom, "atom2id": atom2id,
-            "attacks_by_tag": atk_by_tag, "id_attacks": sorted(list(id_att)),
-        },
-        "semantics": sem,
-        "insights": {
-            "grounded_ids": sorted(list(grounded_ids)),
-            "defense_depth": depth,
-            "preferred_cards": cards,
-            "why": why,
-        },
-        "winners": {
-            "name": winners_semantics,
-            "count": len(win_sets),
-            "sets_atoms": [sorted(list(S)) for S in win_sets],
-        },
-        "ad_available": HAVE_AD,
-    }
+    return md_args, grounded_ids, meta